@@ -0,0 +1,262 @@
+"""Arena: many snakes, players and bots, sharing one board.
+
+Every cell of a shared grid holds the id of the snake covering it (or
+EMPTY), updated incrementally as heads advance and tails retract. Checking a
+new head is one lookup, so a tick costs O(snakes) rather than the
+O(snakes x total length) of testing new_head in every body.
+
+All snakes move one cell per tick, at the same time, against the board as
+it was before the tick. As in SnakeGame, a tail still blocks on the move
+that frees it. A head entering any body cell (its own included) dies,
+heads meeting in one cell all die, and dead snakes leave the board at once
+and may respawn.
+
+Usage:
+    python arena.py --snakes 10 100 1000
+"""
+
+import argparse
+import collections
+import math
+import random
+import time
+from array import array
+
+from game import DIRECTIONS, FOOD_POINTS, FOOD_NORMAL, DEATH_WALL, DEATH_SELF, EVENT_FOOD, EVENT_DEATH, FreeCells
+
+EMPTY = -1
+START_LENGTH = 3
+FOOD_PER_SNAKE = 1  # Food kept on the board per living snake
+BOT_WANDER = 0.1  # Chance a bot turns even when the way ahead is clear
+SPAWN_ATTEMPTS = 64
+CELLS_PER_SNAKE = 100  # Board area per snake in the benchmark
+
+# Death causes beyond game.py's DEATH_WALL and DEATH_SELF
+DEATH_OTHER = 2  # Ran into another snake's body
+DEATH_HEAD_ON = 3  # Met another head in the same cell
+
+
+class ArenaSnake:
+    """One snake in an arena; its id indexes Arena.snakes and the grid."""
+
+    __slots__ = ("id", "body", "direction", "alive", "score", "bot")
+
+    def __init__(self, snake_id, body, direction, bot):
+        self.id = snake_id
+        self.body = collections.deque(body)  # Head first
+        self.direction = direction
+        self.alive = True
+        self.score = 0
+        self.bot = bot
+
+
+class Arena:
+    """Board state for any number of snakes, advanced with step()."""
+
+    def __init__(self, width, height, seed=None, respawn=True):
+        self.width = width
+        self.height = height
+        self.rng = random.Random(seed)
+        self.respawn = respawn
+        self.grid = array("i", [EMPTY]) * (width * height)  # Row-major cell -> snake id
+        self.free_cells = FreeCells(width * height)  # Cells with neither snake nor food
+        self.food = set()  # Cell indices
+        self.snakes = []
+        self.living = 0
+        self.ticks = 0
+
+    def add_snake(self, bot=True):
+        """Place a new snake on free cells; returns its id, or None if no room was found."""
+        snake_id = len(self.snakes)
+        snake = ArenaSnake(snake_id, (), None, bot)
+        self.snakes.append(snake)
+        if not self._spawn(snake):
+            snake.alive = False
+            return None
+        return snake_id
+
+    def turn(self, snake_id, direction):
+        """Change a snake's direction unless it would reverse onto itself."""
+        snake = self.snakes[snake_id]
+        dx, dy = snake.direction
+        if direction != (-dx, -dy):
+            snake.direction = direction
+
+    def step(self):
+        """Move every living snake one cell; returns (EVENT_FOOD | EVENT_DEATH, snake id, position, ...) events."""
+        width, height, grid = self.width, self.height, self.grid
+        events = []
+        self.ticks += 1
+        moves = []  # (snake, cell)
+        deaths = []  # (snake, position, cause)
+        arrivals = {}  # Target cell -> first snake moving there
+        head_on = set()
+        for snake in self.snakes:
+            if not snake.alive:
+                continue
+            if snake.bot:
+                self._steer(snake)
+            head_x, head_y = snake.body[0]
+            dx, dy = snake.direction
+            x, y = head_x + dx, head_y + dy
+            if not (0 <= x < width and 0 <= y < height):
+                deaths.append((snake, (x, y), DEATH_WALL))
+                continue
+            cell = y * width + x
+            owner = grid[cell]
+            if owner != EMPTY:
+                deaths.append((snake, (x, y), DEATH_SELF if owner == snake.id else DEATH_OTHER))
+                continue
+            other = arrivals.setdefault(cell, snake)
+            if other is not snake:
+                head_on.add(other)
+                head_on.add(snake)
+            moves.append((snake, cell))
+
+        for snake, cell in moves:
+            if snake in head_on:
+                deaths.append((snake, (cell % width, cell // width), DEATH_HEAD_ON))
+        for snake, position, cause in deaths:
+            events.append((EVENT_DEATH, snake.id, position, cause))
+            self._remove(snake)
+
+        food = self.food
+        free_cells = self.free_cells
+        for snake, cell in moves:
+            if not snake.alive:
+                continue
+            body = snake.body
+            body.appendleft((cell % width, cell // width))
+            grid[cell] = snake.id
+            if cell in food:
+                food.remove(cell)
+                snake.score += FOOD_POINTS[FOOD_NORMAL]
+                events.append((EVENT_FOOD, snake.id, body[0], FOOD_POINTS[FOOD_NORMAL]))
+            else:
+                free_cells.remove(cell)
+                tail_x, tail_y = body.pop()
+                tail = tail_y * width + tail_x
+                grid[tail] = EMPTY
+                free_cells.add(tail)
+
+        if self.respawn:
+            for snake, _, _ in deaths:
+                self._spawn(snake)
+        self._add_food()
+        return events
+
+    def _steer(self, snake):
+        """Cheap bot: keep going unless blocked (or on a whim), then pick a random open direction."""
+        head_x, head_y = snake.body[0]
+        dx, dy = snake.direction
+        if not self._open(head_x + dx, head_y + dy) or self.rng.random() < BOT_WANDER:
+            options = [(ox, oy) for ox, oy in DIRECTIONS
+                       if (ox, oy) != (-dx, -dy) and self._open(head_x + ox, head_y + oy)]
+            if options:
+                snake.direction = self.rng.choice(options)
+
+    def _open(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and self.grid[y * self.width + x] == EMPTY
+
+    def _remove(self, snake):
+        width, grid, free_cells = self.width, self.grid, self.free_cells
+        for x, y in snake.body:
+            cell = y * width + x
+            grid[cell] = EMPTY
+            free_cells.add(cell)
+        snake.body.clear()
+        snake.alive = False
+        self.living -= 1
+
+    def _spawn(self, snake):
+        """Lay snake out straight on free cells, head first; False if no spot was found."""
+        width, height = self.width, self.height
+        for _ in range(SPAWN_ATTEMPTS):
+            cell = self.free_cells.choice(self.rng)
+            if cell is None:
+                return False
+            dx, dy = self.rng.choice(DIRECTIONS)
+            x, y = cell % width, cell // width
+            body = [(x - dx * i, y - dy * i) for i in range(START_LENGTH)]
+            # Needs free cells for the body plus one cell of room ahead of the head
+            ahead = (x + dx, y + dy)
+            if all(0 <= bx < width and 0 <= by < height and by * width + bx in self.free_cells
+                   for bx, by in (*body, ahead)):
+                break
+        else:
+            return False
+        snake.body = collections.deque(body)
+        snake.direction = (dx, dy)
+        snake.alive = True
+        self.living += 1
+        for x, y in body:
+            cell = y * width + x
+            self.grid[cell] = snake.id
+            self.free_cells.remove(cell)
+        return True
+
+    def _add_food(self):
+        while len(self.food) < self.living * FOOD_PER_SNAKE:
+            cell = self.free_cells.choice(self.rng)
+            if cell is None:
+                return
+            self.free_cells.remove(cell)
+            self.food.add(cell)
+
+
+def naive_collisions(arena):
+    """The quadratic check the grid replaces: each new head against every body."""
+    hits = 0
+    bodies = [snake.body for snake in arena.snakes if snake.alive]
+    for snake in arena.snakes:
+        if snake.alive:
+            head_x, head_y = snake.body[0]
+            dx, dy = snake.direction
+            new_head = (head_x + dx, head_y + dy)
+            hits += any(new_head in body for body in bodies)
+    return hits
+
+
+def benchmark(count, seconds, seed=0):
+    """Ticks per second for count bot snakes on a board scaled to keep density constant."""
+    side = math.ceil(math.sqrt(count * CELLS_PER_SNAKE))
+    arena = Arena(side, side, seed)
+    for _ in range(count):
+        arena.add_snake()
+    for _ in range(50):  # Let the snakes grow a little first
+        arena.step()
+    ticks = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        arena.step()
+        ticks += 1
+    elapsed = time.perf_counter() - start
+    lengths = [len(snake.body) for snake in arena.snakes if snake.alive]
+    naive_start = time.perf_counter()
+    naive_ticks = 0
+    while time.perf_counter() - naive_start < seconds / 4:
+        naive_collisions(arena)
+        naive_ticks += 1
+    naive = (time.perf_counter() - naive_start) / naive_ticks
+    return {"snakes": count, "board": side, "ticks_per_s": ticks / elapsed,
+            "ns_per_snake_move": elapsed / ticks / count * 1e9,
+            "mean_length": sum(lengths) / max(len(lengths), 1), "naive_check_ms": naive * 1e3}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark arena ticks with many bot snakes")
+    parser.add_argument("--snakes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seconds", type=float, default=2.0, help="time per snake count")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'snakes':>7} {'board':>9} {'ticks/s':>10} {'ns/snake':>9} {'length':>7} {'naive check':>12}")
+    for count in args.snakes:
+        result = benchmark(count, args.seconds, args.seed)
+        print(f"{count:>7} {result['board']:>4}x{result['board']:<4} {result['ticks_per_s']:>10.0f} "
+              f"{result['ns_per_snake_move']:>9.0f} {result['mean_length']:>7.1f} "
+              f"{result['naive_check_ms']:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Versioned on-disk cache of baked surfaces.
+
+Sprites, particle circles and text glyphs are drawn with pygame primitives
+on first use. AssetCache stores everything baked in a session as one file of
+RGBA pixels, so later runs read them all with a single read and decode each
+one on first use instead of drawing it again.
+
+The file is tagged with a fingerprint of the code that draws the surfaces
+(the source of the modules in SOURCES), the pygame version and
+ASSET_FORMAT. Editing any of those makes the old file stale, so it is
+ignored and rewritten.
+
+File layout:
+    header   b"SNKA", format (u8), fingerprint (32 bytes), index length (u32)
+    index    JSON [[key, width, height], ...]; tuples in keys are stored as lists
+    pixels   each surface's RGBA bytes, in index order
+"""
+
+import hashlib
+import json
+import os
+import struct
+import time
+
+import pygame
+
+MAGIC = b"SNKA"
+ASSET_FORMAT = 1
+HEADER = struct.Struct("<4sB32sI")
+SOURCES = ("render.py", "sprites.py", "particles.py", "fonts.py", "assets.py")  # Code that draws cached surfaces
+CACHE_FILE = "assets.bin"
+
+
+def cache_dir():
+    """Per-user cache directory (SNAKE_CACHE_DIR overrides it)."""
+    if os.environ.get("SNAKE_CACHE_DIR"):
+        return os.environ["SNAKE_CACHE_DIR"]
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "snake-game")
+
+
+def _tuples(value):
+    """Undo JSON's turning tuples into lists."""
+    return tuple(_tuples(item) for item in value) if isinstance(value, list) else value
+
+
+def fingerprint():
+    """Hash of everything that decides how cached surfaces look."""
+    digest = hashlib.sha256(f"{ASSET_FORMAT} {pygame.version.ver}".encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in SOURCES:
+        with open(os.path.join(here, name), "rb") as source:
+            digest.update(source.read())
+    return digest.digest()
+
+
+class AssetCache:
+    """Baked surfaces by key, read from one cache file and decoded as they are asked for."""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(cache_dir(), CACHE_FILE)
+        self.fingerprint = fingerprint()
+        self.data = b""  # The whole cache file
+        self.index = {}  # key -> (offset, width, height) into data
+        self.load_ms = 0.0
+
+    def __len__(self):
+        return len(self.index)
+
+    def load(self):
+        """Read the cache file in one go; returns False (and holds nothing) when it is missing, stale or damaged."""
+        start = time.perf_counter()
+        try:
+            with open(self.path, "rb") as stream:
+                data = stream.read()
+        except OSError:
+            return False
+        index = {}
+        try:
+            magic, version, stamp, index_length = HEADER.unpack_from(data)
+            if magic != MAGIC or version != ASSET_FORMAT or stamp != self.fingerprint:
+                return False
+            offset = HEADER.size + index_length
+            for key, width, height in json.loads(data[HEADER.size:offset]):
+                index[_tuples(key)] = (offset, width, height)
+                offset += width * height * 4
+        except (struct.error, ValueError, TypeError):
+            return False
+        if offset != len(data):
+            return False
+        self.data, self.index = data, index
+        self.load_ms = (time.perf_counter() - start) * 1000
+        return True
+
+    def get(self, key):
+        """The cached Surface for key (a new RGBA Surface each call), or None."""
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        offset, width, height = entry
+        return pygame.image.frombytes(self.data[offset:offset + width * height * 4], (width, height), "RGBA")
+
+    def stale(self, keys):
+        """Whether keys include any the cache file doesn't hold."""
+        return not self.index.keys() >= set(keys)
+
+    def save(self, surfaces):
+        """Rewrite the cache file with surfaces ({key: Surface}) added to what it already holds.
+
+        Keys are tuples of JSON values and tuples.
+        """
+        entries = [(key, surface.get_size(), pygame.image.tobytes(surface, "RGBA")) for key, surface in surfaces.items()]
+        data = self.data
+        entries += [(key, (width, height), data[offset:offset + width * height * 4])
+                    for key, (offset, width, height) in self.index.items() if key not in surfaces]
+        index = json.dumps([(key, *size) for key, size, _ in entries], separators=(",", ":")).encode()
+        blob = b"".join([HEADER.pack(MAGIC, ASSET_FORMAT, self.fingerprint, len(index)), index,
+                         *(pixels for _, _, pixels in entries)])
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as stream:
+            stream.write(blob)
+        os.replace(temporary, self.path)  # Readers see the old file or the new one, never half of one
+        self.data = blob
+        self.index = {}
+        offset = HEADER.size + len(index)
+        for key, (width, height), _ in entries:
+            self.index[key] = (offset, width, height)
+            offset += width * height * 4
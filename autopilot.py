@@ -0,0 +1,291 @@
+"""Autopilot that plays the game in place of the keyboard.
+
+Paths to the food come from A* over a time-aware view of the body: a segment
+only blocks a cell until the tail has moved past it, so the snake can plan
+through cells its own body is about to leave. Before a path is taken, the
+snake is simulated to the food to check it can still reach its tail from
+there; otherwise it chases its tail until a safe path opens up.
+
+Work is reused between moves so decisions stay fast on very large boards:
+body cells are tracked incrementally by serial number rather than rebuilt,
+a planned path is kept until the food moves or its next cell is blocked, a
+tail chase is extended along the body's own trail instead of re-planned each
+move, and A* with a Manhattan heuristic on the open board only explores cells near the
+path instead of a full-board BFS.
+
+Usage:
+    python autopilot.py --width 500 --height 500 --games 3
+"""
+
+import argparse
+import collections
+import heapq
+import itertools
+import time
+
+import game as game_rules
+from game import DIRECTIONS, SnakeGame
+
+MAX_EXPANSIONS = 50000  # A* gives up (and the snake plays safe) beyond this many cells
+RETRY_MOVES = 4  # While chasing the tail, moves between attempts to reach the food
+ROOM_FACTOR = 4  # Room (in snake lengths) that counts as safe when the tail isn't reached
+LATENCY_SAMPLES = 4096  # Decision latencies kept for percentiles
+
+
+class Autopilot:
+    """Chooses a direction once per move; callable as a tournament bot."""
+
+    def __init__(self, max_expansions=MAX_EXPANSIONS):
+        self.max_expansions = max_expansions
+        self.latencies = collections.deque(maxlen=LATENCY_SAMPLES)  # Nanoseconds per decision
+        self.decisions = 0
+        self.replans = 0
+        self.reset()
+
+    def reset(self):
+        """Forget cached paths and body tracking, e.g. after a restart."""
+        self.path = collections.deque()  # Cells still to visit, next move first
+        self.target = None  # Food cell the cached path leads to, None while chasing the tail
+        self.chase_moves = 0  # Moves since the last attempt to plan a path to the food
+        self.expected = None  # Where the head should be if the last decision was followed
+        self.last_head = None  # Head at the last decision
+        # Body tracking: cell -> serial of the newest segment there; a segment is part of the
+        # body while its serial is above tail_base, and leaves after serial - tail_base moves
+        self.serials = {}
+        self.head_serial = -1
+        self.tail_base = 0
+        self.head = None
+        self.length = 0
+
+    def __call__(self, game, rng=None):
+        return self.decide(game)
+
+    def poll(self, game):
+        """Decide once per move: a direction to turn to, or None while the snake hasn't moved."""
+        if game.game_over or game.snake[0] == self.last_head:
+            return None
+        self.last_head = game.snake[0]
+        return self.decide(game)
+
+    def decide(self, game):
+        """Pick the direction for the snake's next move (None keeps going straight)."""
+        start = time.perf_counter_ns()
+        self._track(game.snake)
+        direction = self._decide(game)
+        self.latencies.append(time.perf_counter_ns() - start)
+        self.decisions += 1
+        return direction
+
+    def stats(self):
+        """Decision count, replans and latency percentiles in microseconds."""
+        samples = sorted(self.latencies)
+
+        def percentile(q):
+            return samples[min(len(samples) - 1, len(samples) * q // 100)] / 1000 if samples else 0.0
+
+        return {"decisions": self.decisions, "replans": self.replans,
+                "p50_us": percentile(50), "p99_us": percentile(99), "max_us": percentile(100)}
+
+    def _track(self, snake):
+        """Update body serials for the moves since the last decision."""
+        head, total = snake[0], len(snake)
+        if head != self.head or total != self.length:
+            if self.length and total >= 2 and snake[1] == self.head and total in (self.length, self.length + 1):
+                self.head_serial += 1
+                self.serials[head] = self.head_serial
+            else:
+                # Restart or missed moves: re-number from scratch
+                self.serials = {cell: serial for serial, cell in enumerate(reversed(snake))}
+                self.head_serial = total - 1
+            self.head, self.length = head, total
+        self.tail_base = self.head_serial - total
+
+    def _blocked(self, cell, moves):
+        """Whether cell is a wall or still has a body segment after moves - 1 moves."""
+        x, y = cell
+        if not (0 <= x < game_rules.GRID_WIDTH and 0 <= y < game_rules.GRID_HEIGHT):
+            return True
+        serial = self.serials.get(cell)
+        return serial is not None and serial - self.tail_base >= moves
+
+    def _decide(self, game):
+        head = game.snake[0]
+        path = self.path
+        if path and (head != self.expected or self._blocked(path[0], 1)):
+            path.clear()
+        elif self.target is not None and game.food != self.target:
+            path.clear()  # The food moved
+        elif self.target is None:
+            # Chasing the tail: look for a safe food path again every few moves, and never
+            # grow by accident, since the retraced trail is only safe at a constant length
+            self.chase_moves += 1
+            if self.chase_moves >= RETRY_MOVES or (path and path[0] in self._pickups(game)):
+                path.clear()
+        if not path:
+            self._replan(game)
+        if path:
+            step = path.popleft()
+        else:
+            step = self._escape(game)
+            if step is None:
+                self.expected = None
+                return None
+        self.expected = step
+        return (step[0] - head[0], step[1] - head[1])
+
+    def _replan(self, game):
+        """Fill self.path with a safe path to the food, or else a tail chase."""
+        self.target = None
+        self.chase_moves = 0
+        if game.food is not None:
+            path = self._plan(game)
+            if path:
+                self.path.extend(path)
+                self.target = game.food
+                return
+        snake = game.snake
+        if len(snake) > 1:
+            pickups = self._pickups(game)
+            path = self._astar(snake[0], snake[-1], lambda cell, moves: cell in pickups or self._blocked(cell, moves))
+            if path:
+                # After reaching the tail, retrace the body: each cell is left just before the head arrives
+                self.path.extend(path)
+                self.path.extend(itertools.islice(reversed(snake), 1, None))
+
+    def _pickups(self, game):
+        """Cells that would make the snake grow."""
+        return {cell for cell in (game.food, game.powerup[0] if game.powerup else None) if cell}
+
+    def _plan(self, game):
+        """Path to the food, or [] if there is none or it would trap the snake."""
+        self.replans += 1
+        path = self._astar(game.snake[0], game.food, self._blocked)
+        if path and self._tail_reachable_after(path, game.snake):
+            return path
+        return []
+
+    def _tail_reachable_after(self, path, snake):
+        """Simulate following path and eating, then check the head can reach the tail.
+
+        Finding ROOM_FACTOR times the snake's length in free cells also counts,
+        which bounds the search by the snake's length rather than the board size.
+        """
+        length = len(snake) + 1
+        body = list(reversed(path))[:length]
+        body.extend(itertools.islice(snake, 0, length - len(body)))
+        if game_rules.GRID_WIDTH * game_rules.GRID_HEIGHT <= length:
+            return True  # Eating this food fills the board
+        index = {}
+        for i, cell in enumerate(body):
+            index.setdefault(cell, i)
+
+        def blocked(cell, moves):
+            x, y = cell
+            if not (0 <= x < game_rules.GRID_WIDTH and 0 <= y < game_rules.GRID_HEIGHT):
+                return True
+            i = index.get(cell)
+            return i is not None and length - i >= moves
+
+        limit = ROOM_FACTOR * length
+        return self._room(body[0], 0, limit, blocked, goal=body[-1]) >= limit
+
+    def _escape(self, game):
+        """Neither food nor tail is reachable: take the move with the most room."""
+        snake = game.snake
+        head = snake[0]
+        best, best_room = None, 0
+        for dx, dy in DIRECTIONS:
+            cell = (head[0] + dx, head[1] + dy)
+            if not self._blocked(cell, 1):
+                room = self._room(cell, 1, len(snake), self._blocked)
+                if room > best_room:
+                    best, best_room = cell, room
+        return best
+
+    def _room(self, start, moves, limit, blocked, goal=None):
+        """Cells reachable from start (reached on the given move), counting up to limit.
+
+        Reaching goal counts as limit.
+        """
+        seen = {start}
+        frontier = collections.deque([(start, moves)])
+        while frontier and len(seen) < limit:
+            (x, y), moves = frontier.popleft()
+            for dx, dy in DIRECTIONS:
+                cell = (x + dx, y + dy)
+                if cell not in seen and not blocked(cell, moves + 1):
+                    if cell == goal:
+                        return limit
+                    seen.add(cell)
+                    frontier.append((cell, moves + 1))
+        return len(seen)
+
+    def _astar(self, start, goal, blocked):
+        """Shortest path from start to goal (excluding start), or [] if none within the budget.
+
+        blocked(cell, moves) says whether cell can't be entered on the given move.
+        """
+        goal_x, goal_y = goal
+        came_from = {start: None}
+        cost = {start: 0}
+        h = abs(start[0] - goal_x) + abs(start[1] - goal_y)
+        heap = [(h, h, 0, start)]
+        expansions = 0
+        while heap:
+            _, _, moves, cell = heapq.heappop(heap)
+            if cell == goal:
+                path = []
+                while cell != start:
+                    path.append(cell)
+                    cell = came_from[cell]
+                path.reverse()
+                return path
+            if moves > cost[cell]:
+                continue  # Stale heap entry
+            expansions += 1
+            if expansions > self.max_expansions:
+                break
+            x, y = cell
+            moves += 1
+            for dx, dy in DIRECTIONS:
+                neighbor = (x + dx, y + dy)
+                if cost.get(neighbor, moves + 1) <= moves or blocked(neighbor, moves):
+                    continue
+                cost[neighbor] = moves
+                came_from[neighbor] = cell
+                h = abs(neighbor[0] - goal_x) + abs(neighbor[1] - goal_y)
+                heapq.heappush(heap, (moves + h, h, moves, neighbor))  # Ties go to the cell nearer the goal
+        return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the autopilot headless and report decision latency")
+    parser.add_argument("--width", type=int, default=game_rules.GRID_WIDTH)
+    parser.add_argument("--height", type=int, default=game_rules.GRID_HEIGHT)
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=60 * 60 * 10,
+                        help="stop a game after this many 1/60 s ticks")
+    args = parser.parse_args()
+    game_rules.GRID_WIDTH, game_rules.GRID_HEIGHT = args.width, args.height
+
+    autopilot = Autopilot()
+    for seed in range(args.seed, args.seed + args.games):
+        game = SnakeGame(seed)
+        autopilot.reset()
+        start = time.perf_counter()
+        while not game.game_over and game.ticks < args.max_ticks:
+            direction = autopilot.poll(game)
+            if direction is not None:
+                game.turn(direction)
+            game.step(None, 1.0 / 60)
+        ending = "won" if game.won else "died" if game.game_over else "stopped"
+        print(f"seed {seed}: score {game.score}, length {len(game.snake)}, {game.ticks} ticks, "
+              f"{ending} ({time.perf_counter() - start:.2f}s)")
+    stats = autopilot.stats()
+    print(f"{stats['decisions']} decisions, {stats['replans']} replans, latency p50 {stats['p50_us']:.1f}us "
+          f"p99 {stats['p99_us']:.1f}us max {stats['max_us']:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
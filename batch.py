@@ -0,0 +1,445 @@
+"""Vectorized batch simulator running many independent games with NumPy.
+
+BatchSnakeGame holds N boards as arrays (head ring buffers, occupancy grids,
+timers, scores) and advances all of them with one step(actions, dt) call.
+The rules mirror game.SnakeGame exactly; only the random draws differ, which
+``python batch.py --check`` accounts for by replaying the batch's draws into
+scalar games and comparing state after every tick.
+
+Usage:
+    python batch.py --check
+    python batch.py --bench --games 4096 --ticks 2000
+"""
+
+import argparse
+import collections
+import time
+
+import numpy as np
+
+from effects import EXTEND, STACK, IGNORE
+from game import (
+    GRID_WIDTH, GRID_HEIGHT, GAME_SPEED, DIFFICULTY_STEP, DIFFICULTY_CAP,
+    SPEED_BOOST, SLOW_MOTION, FOOD_NORMAL, FOOD_BONUS, FOOD_SPECIAL,
+    FOOD_POINTS, FOOD_SPECIAL_CHANCE, FOOD_BONUS_CHANCE, POWERUP_SPEED,
+    POWERUP_SLOW, POWERUP_DOUBLE, POWERUP_INVINCIBLE, POWERUP_COUNT,
+    POWERUP_DURATIONS, POWERUP_STACKING, POWERUP_SPAWN_INTERVAL, POWERUP_SPAWN_CHANCE,
+    POWERUP_LIFETIME, DIRECTIONS, RIGHT, DEATH_WALL, DEATH_SELF, TIMER_SPAWN, SnakeGame,
+)
+
+NO_ACTION = -1  # Action code that keeps the current direction
+
+DIRECTION_DX = np.array([d[0] for d in DIRECTIONS], dtype=np.int64)
+DIRECTION_DY = np.array([d[1] for d in DIRECTIONS], dtype=np.int64)
+OPPOSITE = np.array([DIRECTIONS.index((-dx, -dy)) for dx, dy in DIRECTIONS], dtype=np.int8)
+FOOD_POINTS_ARRAY = np.array(FOOD_POINTS, dtype=np.int64)
+DURATIONS_ARRAY = np.array([POWERUP_DURATIONS[t] for t in range(POWERUP_COUNT)])
+STACKING_ARRAY = np.array([POWERUP_STACKING[t] for t in range(POWERUP_COUNT)])
+# One expiry per effect can't hold several overlapping instances
+assert STACK not in POWERUP_STACKING.values(), "the batch engine doesn't support STACK power-ups"
+
+
+class BatchSnakeGame:
+    """N independent games advanced together with vectorized step()."""
+
+    def __init__(self, n, seed=None, record=False):
+        self.n = n
+        self.width = GRID_WIDTH
+        self.height = GRID_HEIGHT
+        # Ring buffers need one spare slot because the head is pushed before the tail pops
+        self.capacity = self.width * self.height + 2
+        # Per-game log of random draws, used by check_parity() to drive scalar games
+        self.record = record
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Start all N games from scratch."""
+        n = self.n
+        self.rng = np.random.default_rng(seed)
+        self.body_x = np.zeros((n, self.capacity), dtype=np.int16)
+        self.body_y = np.zeros((n, self.capacity), dtype=np.int16)
+        self.head_slot = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.occupancy = np.zeros((n, self.height, self.width), dtype=np.uint16)
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.food_x = np.zeros(n, dtype=np.int64)
+        self.food_y = np.zeros(n, dtype=np.int64)
+        self.food_type = np.zeros(n, dtype=np.int64)
+        self.powerup_active = np.zeros(n, dtype=bool)
+        self.powerup_x = np.zeros(n, dtype=np.int64)
+        self.powerup_y = np.zeros(n, dtype=np.int64)
+        self.powerup_type = np.zeros(n, dtype=np.int64)
+        self.powerup_expiry = np.zeros(n)  # Game time the power-up leaves the board
+        self.score = np.zeros(n, dtype=np.int64)
+        self.score_multiplier = np.ones(n, dtype=np.int64)
+        self.current_game_speed = np.full(n, float(GAME_SPEED))
+        self.game_over = np.zeros(n, dtype=bool)
+        self.won = np.zeros(n, dtype=bool)
+        self.death_cause = np.full(n, -1, dtype=np.int8)
+        self.move_timer = np.zeros(n)
+        self.time = np.zeros(n)  # Seconds of game time, the clock the expiries below are on
+        self.effect_expiry = np.zeros((n, POWERUP_COUNT))  # Indexed by power-up type; running while > time
+        self.spawn_at = np.zeros(n)  # Earliest game time of the next power-up spawn attempt
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.log = [collections.deque() for _ in range(n)] if self.record else None
+        self.reset_games(np.arange(n))
+
+    def reset_games(self, idx):
+        """Restart the games at the given indices, e.g. the ones that just ended."""
+        idx = np.asarray(idx)
+        idx = np.flatnonzero(idx) if idx.dtype == bool else idx.astype(np.int64)
+        if len(idx) == 0:
+            return
+        cx, cy = GRID_WIDTH // 2, GRID_HEIGHT // 2
+        self.occupancy[idx] = 0
+        for slot, offset in enumerate((2, 1, 0)):
+            self.body_x[idx, slot] = cx - offset
+            self.body_y[idx, slot] = cy
+            self.occupancy[idx, cy, cx - offset] = 1
+        self.head_slot[idx] = 2
+        self.length[idx] = 3
+        self.direction[idx] = DIRECTIONS.index(RIGHT)
+        self.food_type[idx] = FOOD_NORMAL
+        self.powerup_active[idx] = False
+        self.powerup_expiry[idx] = 0.0
+        self.score[idx] = 0
+        self.score_multiplier[idx] = 1
+        self.current_game_speed[idx] = GAME_SPEED
+        self.game_over[idx] = False
+        self.won[idx] = False
+        self.death_cause[idx] = -1
+        self.move_timer[idx] = 0.0
+        self.time[idx] = 0.0
+        self.effect_expiry[idx] = 0.0
+        self.spawn_at[idx] = 0.0 + POWERUP_SPAWN_INTERVAL
+        self.ticks[idx] = 0
+        if self.log is not None:
+            for g in idx:
+                self.log[g].clear()
+        self.food_x[idx], self.food_y[idx], _ = self._spawn_positions(idx, exclude_powerup=False)
+
+    def turn(self, actions):
+        """Apply direction codes (index into DIRECTIONS, or NO_ACTION), refusing reversals."""
+        actions = np.asarray(actions, dtype=np.int8)
+        mask = (actions >= 0) & (actions != OPPOSITE[self.direction])
+        self.direction[mask] = actions[mask]
+
+    def step(self, actions=None, dt=1.0 / 60):
+        """Advance every game by dt seconds, optionally turning first."""
+        if actions is not None:
+            self.turn(actions)
+        self.ticks += 1
+        previous = self.time.copy()
+        self.time += dt
+        now = self.time
+
+        # Update score multiplier and game speed from the effects still running
+        running = self.effect_expiry > now[:, None]
+        self.score_multiplier = np.where(running[:, POWERUP_DOUBLE], 2, 1)
+        speed_multiplier = np.where(running[:, POWERUP_SPEED], SPEED_BOOST,
+                                    np.where(running[:, POWERUP_SLOW], SLOW_MOTION, 1.0))
+        difficulty_bonus = np.minimum(self.score // DIFFICULTY_STEP, DIFFICULTY_CAP)
+        self.current_game_speed = (GAME_SPEED + difficulty_bonus) * speed_multiplier
+
+        alive = ~self.game_over
+        self.move_timer[alive] += dt
+        moving = alive & (self.move_timer >= 1.0 / self.current_game_speed)
+        self.move_timer[moving] = 0.0
+        if moving.any():
+            self._move(np.flatnonzero(moving), previous)
+
+        # Spawn power-ups (games that died this tick still finish the tick, like the scalar loop)
+        want = alive & ~self.powerup_active & ~(self.spawn_at > now)
+        if want.any():
+            self._spawn_powerups(np.flatnonzero(want), previous)
+
+        # Remove power-ups whose lifetime ran out
+        self.powerup_active[alive & self.powerup_active & (self.powerup_expiry <= now)] = False
+
+    def snake(self, g):
+        """Body of game g as a list of (x, y), head first (for inspection and rendering)."""
+        slots = (self.head_slot[g] - np.arange(self.length[g])) % self.capacity
+        return list(zip(self.body_x[g, slots].tolist(), self.body_y[g, slots].tolist()))
+
+    def _move(self, idx, previous):
+        """Move the snakes of games idx one cell, resolving collisions and pickups; previous is the time before this step."""
+        d = self.direction[idx]
+        head = self.head_slot[idx]
+        new_x = self.body_x[idx, head].astype(np.int64) + DIRECTION_DX[d]
+        new_y = self.body_y[idx, head].astype(np.int64) + DIRECTION_DY[d]
+
+        # Collisions are skipped while invincible; the snake may then leave the board
+        vulnerable = ~(self.effect_expiry[idx, POWERUP_INVINCIBLE] > self.time[idx])
+        inside = (new_x >= 0) & (new_x < self.width) & (new_y >= 0) & (new_y < self.height)
+        occupied = np.zeros(len(idx), dtype=bool)
+        occupied[inside] = self.occupancy[idx[inside], new_y[inside], new_x[inside]] > 0
+        wall = vulnerable & ~inside
+        hit_self = vulnerable & inside & occupied
+        self.game_over[idx[wall]] = True
+        self.death_cause[idx[wall]] = DEATH_WALL
+        self.game_over[idx[hit_self]] = True
+        self.death_cause[idx[hit_self]] = DEATH_SELF
+
+        ok = ~(wall | hit_self)
+        idx, new_x, new_y, inside = idx[ok], new_x[ok], new_y[ok], inside[ok]
+        if len(idx) == 0:
+            return
+        if self.length.max() + 2 > self.capacity:
+            self._grow()
+
+        # Push the new head
+        head = (self.head_slot[idx] + 1) % self.capacity
+        self.head_slot[idx] = head
+        self.body_x[idx, head] = new_x
+        self.body_y[idx, head] = new_y
+        self.length[idx] += 1
+        self.occupancy[idx[inside], new_y[inside], new_x[inside]] += 1
+
+        ate = (new_x == self.food_x[idx]) & (new_y == self.food_y[idx])
+        picked = (~ate & self.powerup_active[idx]
+                  & (new_x == self.powerup_x[idx]) & (new_y == self.powerup_y[idx]))
+
+        if ate.any():
+            eaters = idx[ate]
+            self.score[eaters] += FOOD_POINTS_ARRAY[self.food_type[eaters]] * self.score_multiplier[eaters]
+            rand = self.rng.random(len(eaters))
+            self.food_type[eaters] = np.where(rand < FOOD_SPECIAL_CHANCE, FOOD_SPECIAL,
+                                              np.where(rand < FOOD_BONUS_CHANCE, FOOD_BONUS, FOOD_NORMAL))
+            if self.log is not None:
+                for g, r in zip(eaters.tolist(), rand.tolist()):
+                    self.log[g].append(("random", r))
+            self.food_x[eaters], self.food_y[eaters], found = self._spawn_positions(eaters, exclude_powerup=True)
+            # Nowhere left to put food: the snake filled the board
+            self.game_over[eaters[~found]] = True
+            self.won[eaters[~found]] = True
+
+        if picked.any():
+            pickers = idx[picked]
+            kinds = self.powerup_type[pickers]
+            expiry = self.effect_expiry[pickers, kinds]
+            fresh = self.time[pickers] + DURATIONS_ARRAY[kinds]
+            running = expiry > self.time[pickers]
+            rules = STACKING_ARRAY[kinds]
+            # Same rules as effects.TimedEffects.start for a key that is already running
+            self.effect_expiry[pickers, kinds] = np.where(
+                running & (rules == EXTEND), expiry + DURATIONS_ARRAY[kinds],
+                np.where(running & (rules == IGNORE), expiry, fresh))
+            self.powerup_active[pickers] = False
+            self.spawn_at[pickers] = previous[pickers] + POWERUP_SPAWN_INTERVAL
+
+        # Everyone else drops their tail
+        rest = ~(ate | picked)
+        if rest.any():
+            movers = idx[rest]
+            tail = (self.head_slot[movers] - self.length[movers] + 1) % self.capacity
+            tail_x = self.body_x[movers, tail].astype(np.int64)
+            tail_y = self.body_y[movers, tail].astype(np.int64)
+            on_board = (tail_x >= 0) & (tail_x < self.width) & (tail_y >= 0) & (tail_y < self.height)
+            self.occupancy[movers[on_board], tail_y[on_board], tail_x[on_board]] -= 1
+            self.length[movers] -= 1
+
+    def _spawn_powerups(self, idx, previous):
+        """Roll power-up spawns for games idx whose spawn cooldown has elapsed."""
+        roll = self.rng.random(len(idx))
+        spawn = roll < POWERUP_SPAWN_CHANCE
+        if self.log is not None:
+            for g, r in zip(idx.tolist(), roll.tolist()):
+                self.log[g].append(("random", r))
+        idx = idx[spawn]
+        if len(idx) == 0:
+            return
+        kinds = self.rng.integers(0, POWERUP_COUNT, len(idx))
+        if self.log is not None:
+            for g, k in zip(idx.tolist(), kinds.tolist()):
+                self.log[g].append(("randint", k))
+        x, y, found = self._spawn_positions(idx, exclude_powerup=False, exclude_food=True)
+        idx, kinds = idx[found], kinds[found]
+        self.powerup_x[idx], self.powerup_y[idx] = x[found], y[found]
+        self.powerup_type[idx] = kinds
+        self.powerup_active[idx] = True
+        self.powerup_expiry[idx] = previous[idx] + POWERUP_LIFETIME
+        self.spawn_at[idx] = self.time[idx] + POWERUP_SPAWN_INTERVAL
+
+    def _spawn_positions(self, idx, exclude_powerup, exclude_food=False):
+        """Pick a uniformly random free cell for each game in idx.
+
+        Returns (x, y, found); x and y are -1 where the board had no free cell.
+        """
+        free = (self.occupancy[idx] == 0).reshape(len(idx), -1)
+        rows = np.arange(len(idx))
+        if exclude_powerup:
+            active = self.powerup_active[idx]
+            free[rows[active], (self.powerup_y[idx] * self.width + self.powerup_x[idx])[active]] = False
+        if exclude_food:
+            has_food = self.food_x[idx] >= 0
+            free[rows[has_food], (self.food_y[idx] * self.width + self.food_x[idx])[has_food]] = False
+        counts = free.sum(axis=1)
+        pick = np.floor(self.rng.random(len(idx)) * counts).astype(np.int64)
+        cell = np.argmax(np.cumsum(free, axis=1) > pick[:, None], axis=1)
+        found = counts > 0
+        x = np.where(found, cell % self.width, -1)
+        y = np.where(found, cell // self.width, -1)
+        if self.log is not None:
+            for g, px, py, ok in zip(idx.tolist(), x.tolist(), y.tolist(), found.tolist()):
+                self.log[g].append(("position", (px, py) if ok else None))
+        return x, y, found
+
+    def _grow(self):
+        """Double the ring buffer capacity, unrolling every body tail-first."""
+        new_capacity = self.capacity * 2
+        tail = (self.head_slot - self.length + 1) % self.capacity
+        order = (tail[:, None] + np.arange(self.capacity)[None, :]) % self.capacity
+        for name in ("body_x", "body_y"):
+            old = getattr(self, name)
+            new = np.zeros((self.n, new_capacity), dtype=old.dtype)
+            new[:, :self.capacity] = np.take_along_axis(old, order, axis=1)
+            setattr(self, name, new)
+        self.head_slot = self.length - 1
+        self.capacity = new_capacity
+
+
+class _ScriptedRandom:
+    """Stand-in for random.Random that replays a batch game's recorded draws."""
+
+    def __init__(self, log):
+        self.log = log
+
+    def _next(self, kind):
+        entry_kind, value = self.log.popleft()
+        if entry_kind != kind:
+            raise AssertionError(f"expected a {kind} draw, batch made a {entry_kind} draw")
+        return value
+
+    def random(self):
+        return self._next("random")
+
+    def randint(self, a, b):
+        return self._next("randint")
+
+    def position(self):
+        return self._next("position")
+
+
+class _ScriptedGame(SnakeGame):
+    """Scalar game whose random draws come from a batch game's log."""
+
+    def __init__(self, log):
+        self.script = _ScriptedRandom(log)
+        super().__init__()
+        self.rng = self.script
+
+    def _spawn_position(self, exclude_positions=None):
+        return self.script.position()
+
+
+def _compare(batch, g, game):
+    """Return a description of the first difference between batch game g and a scalar game."""
+    powerup = None
+    if batch.powerup_active[g]:
+        powerup = ((int(batch.powerup_x[g]), int(batch.powerup_y[g])), int(batch.powerup_type[g]),
+                   float(batch.powerup_expiry[g]))
+    food = (int(batch.food_x[g]), int(batch.food_y[g])) if batch.food_x[g] >= 0 else None
+    now = float(batch.time[g])
+    timers = np.maximum(batch.effect_expiry[g] - now, 0.0)
+    spawn_at = float(batch.spawn_at[g]) if batch.spawn_at[g] > now else None
+    scalar_spawn_at = game.board_timers.expiry(TIMER_SPAWN) if game.board_timers.pending(TIMER_SPAWN, game.time) else None
+    checks = (
+        ("game_over", bool(batch.game_over[g]), game.game_over),
+        ("won", bool(batch.won[g]), game.won),
+        ("score", int(batch.score[g]), game.score),
+        ("length", int(batch.length[g]), len(game.snake)),
+        ("head", batch.snake(g)[0], tuple(game.snake[0])),
+        ("direction", DIRECTIONS[batch.direction[g]], game.direction),
+        ("food", food, game.food),
+        ("food_type", int(batch.food_type[g]), game.food_type),
+        ("powerup", powerup, game.powerup),
+        ("move_timer", float(batch.move_timer[g]), game.move_timer),
+        ("time", now, game.time),
+        ("spawn_at", spawn_at, scalar_spawn_at),
+        ("speed_timer", float(timers[POWERUP_SPEED]), game.powerup_speed_timer),
+        ("slow_timer", float(timers[POWERUP_SLOW]), game.powerup_slow_timer),
+        ("double_timer", float(timers[POWERUP_DOUBLE]), game.powerup_double_timer),
+        ("invincible_timer", float(timers[POWERUP_INVINCIBLE]), game.powerup_invincible_timer),
+    )
+    for name, expected, actual in checks:
+        if expected != actual:
+            return f"{name}: batch {expected!r} != scalar {actual!r}"
+    return None
+
+
+def _greedy_actions(batch):
+    """Direction codes that head straight for each game's food."""
+    head_x = batch.body_x[np.arange(batch.n), batch.head_slot]
+    head_y = batch.body_y[np.arange(batch.n), batch.head_slot]
+    dx = batch.food_x - head_x
+    dy = batch.food_y - head_y
+    horizontal = np.where(dx > 0, DIRECTIONS.index(RIGHT), DIRECTIONS.index((-1, 0)))
+    vertical = np.where(dy > 0, DIRECTIONS.index((0, 1)), DIRECTIONS.index((0, -1)))
+    return np.where(dx != 0, horizontal, vertical).astype(np.int8)
+
+
+def check_parity(games=64, ticks=20000, seed=0, dt=1.0 / 60):
+    """Step batch and scalar games side by side and fail on the first divergence."""
+    batch = BatchSnakeGame(games, seed=seed, record=True)
+    scalars = [_ScriptedGame(batch.log[g]) for g in range(games)]
+
+    rng = np.random.default_rng(seed + 1)
+    for tick in range(ticks):
+        # Steer toward the food with some random turns so scoring, growth and deaths all happen
+        actions = _greedy_actions(batch)
+        noise = rng.random(games) < 0.05
+        actions[noise] = rng.integers(0, len(DIRECTIONS), int(noise.sum()))
+        # Restart some finished games so long runs keep exercising the rules
+        restart = np.flatnonzero(batch.game_over & (rng.random(games) < 0.01))
+        batch.reset_games(restart)
+        for g in restart:
+            scalars[g] = _ScriptedGame(batch.log[g])
+
+        batch.step(actions, dt)
+        for g, game in enumerate(scalars):
+            action = DIRECTIONS[actions[g]] if actions[g] != NO_ACTION else None
+            game.step(action, dt)
+            problem = _compare(batch, g, game)
+            if problem is None and batch.log[g]:
+                problem = f"{len(batch.log[g])} random draws not consumed by the scalar game"
+            if problem is None and tick % 500 == 0 and batch.snake(g) != list(game.snake):
+                problem = "body differs"
+            if problem:
+                raise AssertionError(f"game {g} diverged at tick {tick}: {problem}")
+    return int(batch.score.sum()), int(batch.length.max())
+
+
+def benchmark(games=4096, ticks=2000, seed=0, dt=1.0 / 60):
+    """Return simulated game-ticks per second, restarting games as they end."""
+    batch = BatchSnakeGame(games, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    actions = np.where(rng.random((ticks, games)) < 0.1,
+                       rng.integers(0, len(DIRECTIONS), (ticks, games)), NO_ACTION).astype(np.int8)
+    start = time.perf_counter()
+    for tick in range(ticks):
+        batch.step(actions[tick], dt)
+        if tick % 60 == 0:
+            batch.reset_games(np.flatnonzero(batch.game_over))
+    elapsed = time.perf_counter() - start
+    return games * ticks / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized snake batch simulator")
+    parser.add_argument("--check", action="store_true", help="verify parity with the scalar game rules")
+    parser.add_argument("--bench", action="store_true", help="measure throughput in game-ticks per second")
+    parser.add_argument("--games", type=int, default=4096)
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.check:
+        total, longest = check_parity(games=min(args.games, 64), ticks=args.ticks * 10, seed=args.seed)
+        print(f"parity ok (total score {total}, longest snake {longest})")
+    if args.bench or not args.check:
+        rate = benchmark(games=args.games, ticks=args.ticks, seed=args.seed)
+        print(f"{args.games} games x {args.ticks} ticks: {rate:,.0f} game-ticks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""Headless benchmarks for the simulation and rendering hot paths.
+
+Runs under SDL's dummy video driver, so no window or GPU is needed. Each
+benchmark is timed over several repeats and reported as the median time per
+call. Results can be saved as a JSON baseline and later runs compared
+against it (on the fastest repeat), failing when anything got slower than
+the threshold.
+
+Usage:
+    python bench.py                                  # run everything, print a table
+    python bench.py --save baseline.json             # record a baseline
+    python bench.py --compare baseline.json          # exit 1 if anything regressed by more than 20%
+    python bench.py --filter particles --compare baseline.json --threshold 0.1
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import collections
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from cache import TextCache
+from game import (
+    GRID_WIDTH, GRID_HEIGHT, FOOD_SPECIAL, POWERUP_DOUBLE, RIGHT, TIMER_SPAWN,
+    FreeCells, SnakeGame, random_food_position,
+)
+from particles import ParticlePool
+from render import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, PARTICLE_COLORS, TEXT_WHITE,
+    StaticLayers, draw_food, draw_powerup, draw_snake_segment,
+)
+from sprites import SnakeLayer, SpriteAtlas
+
+REPEATS = 5  # Timed repeats per benchmark; the median is reported
+MIN_TIME = 0.5  # Seconds spent timing each benchmark
+DEFAULT_THRESHOLD = 0.2  # Allowed slowdown against a baseline before --compare fails
+
+BENCHMARKS = []  # (name, setup); setup() returns the function to time
+
+
+def benchmark(name, *args):
+    """Register setup(*args) under name."""
+    def register(setup):
+        BENCHMARKS.append((name, lambda: setup(*args)))
+        return setup
+    return register
+
+
+def cycle_cells():
+    """A Hamiltonian cycle over the board: a snake moving along it never collides."""
+    cells = [(0, y) for y in range(GRID_HEIGHT - 1, -1, -1)]
+    for y in range(GRID_HEIGHT):
+        columns = range(1, GRID_WIDTH) if y % 2 == 0 else range(GRID_WIDTH - 1, 0, -1)
+        cells.extend((x, y) for x in columns)
+    return cells
+
+
+def occupied_cells(occupancy, seed=0):
+    """A random set of cells covering the given fraction of the board."""
+    cells = [(x, y) for y in range(GRID_HEIGHT) for x in range(GRID_WIDTH)]
+    random.Random(seed).shuffle(cells)
+    return cells[:int(len(cells) * occupancy)]
+
+
+def game_with_snake(body):
+    """A SnakeGame whose snake is body (head first), with no food or power-up."""
+    game = SnakeGame(0)
+    game.snake = collections.deque(body)
+    game.occupancy = bytearray(GRID_WIDTH * GRID_HEIGHT)
+    game.free_cells = FreeCells(GRID_WIDTH * GRID_HEIGHT)
+    for segment in body:
+        game._occupy(segment)
+    game.food = None
+    game.powerup = None
+    return game
+
+
+def new_screen():
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    return surface.convert() if pygame.display.get_surface() else surface
+
+
+for _occupancy in (0.1, 0.5, 0.9, 0.99):
+    @benchmark(f"random_food_position/occupancy={_occupancy}", _occupancy)
+    def bench_random_food_position(occupancy):
+        snake = occupied_cells(occupancy)
+        rng = random.Random(1)
+        return lambda: random_food_position(snake, rng=rng)
+
+    @benchmark(f"spawn_position/occupancy={_occupancy}", _occupancy)
+    def bench_spawn_position(occupancy):
+        game = game_with_snake(occupied_cells(occupancy))
+        return game._spawn_position
+
+
+for _length in (10, 100, 500):
+    @benchmark(f"move/length={_length}", _length)
+    def bench_move(length):
+        # Walk the snake around a cycle so it never dies; each step is exactly one move
+        cells = cycle_cells()
+        following = {cell: cells[(i + 1) % len(cells)] for i, cell in enumerate(cells)}
+        game = game_with_snake(cells[length - 1::-1])
+        dt = 1.0 / game.current_game_speed
+        game.board_timers.start(TIMER_SPAWN, float("inf"), game.time)  # No power-ups to grow the snake
+
+        def move():
+            head = game.snake[0]
+            after = following[head]
+            game.direction = (after[0] - head[0], after[1] - head[1])
+            game.step(None, dt)
+        return move
+
+
+@benchmark("draw_food")
+def bench_draw_food():
+    surface = new_screen()
+    rotation = [0.0]
+
+    def draw():
+        rotation[0] += 0.05
+        draw_food(surface, (5, 5), FOOD_SPECIAL, 1.5, rotation[0])
+    return draw
+
+
+@benchmark("draw_powerup")
+def bench_draw_powerup():
+    surface = new_screen()
+    rotation = [0.0]
+
+    def draw():
+        rotation[0] += 0.05
+        draw_powerup(surface, (5, 5), POWERUP_DOUBLE, rotation[0])
+    return draw
+
+
+@benchmark("atlas.draw_food")
+def bench_atlas_draw_food():
+    surface = new_screen()
+    atlas = SpriteAtlas()
+    atlas.prebake()
+    rotation = [0.0]
+
+    def draw():
+        rotation[0] += 0.05
+        atlas.draw_food(surface, (5, 5), FOOD_SPECIAL, 1.5, rotation[0])
+    return draw
+
+
+for _length in (100, 500):
+    @benchmark(f"draw_snake_segment/length={_length}", _length)
+    def bench_draw_snake_segment(length):
+        surface = new_screen()
+        snake = cycle_cells()[length - 1::-1]
+
+        def draw():
+            for i, segment in enumerate(snake):
+                draw_snake_segment(surface, segment, i == 0, i, length, RIGHT)
+        return draw
+
+    @benchmark(f"atlas.draw_snake/length={_length}", _length)
+    def bench_atlas_draw_snake(length):
+        surface = new_screen()
+        atlas = SpriteAtlas()
+        atlas.prebake()
+        snake = cycle_cells()[length - 1::-1]
+        return lambda: atlas.draw_snake(surface, snake, RIGHT)
+
+    @benchmark(f"snake_layer.move/length={_length}", _length)
+    def bench_snake_layer_move(length):
+        # One move per call, the worst case: between moves the layer only replays its blits
+        surface = new_screen()
+        atlas = SpriteAtlas()
+        atlas.prebake()
+        layer = SnakeLayer(atlas)
+        cells = cycle_cells()
+        snake = collections.deque(cells[length - 1::-1])
+        position = [length]
+
+        def draw():
+            snake.appendleft(cells[position[0] % len(cells)])
+            snake.pop()
+            position[0] += 1
+            layer.draw(surface, snake, RIGHT)
+        return draw
+
+
+def full_pool(count):
+    pool = ParticlePool(PARTICLE_COLORS, capacity=count, seed=0)
+    rng = np.random.default_rng(0)
+    for x, y in zip(rng.uniform(0, SCREEN_WIDTH, count // 10), rng.uniform(0, SCREEN_HEIGHT, count // 10)):
+        pool.emit(x, y, PARTICLE_COLORS, 10)
+    return pool
+
+
+for _count in (100, 1000, 10000):
+    @benchmark(f"particles.update/count={_count}", _count)
+    def bench_particles_update(count):
+        pool = full_pool(count)
+        return lambda: pool.update(0.0)  # dt 0 keeps every particle alive while still doing all the work
+
+    @benchmark(f"particles.draw/count={_count}", _count)
+    def bench_particles_draw(count):
+        surface = new_screen()
+        pool = full_pool(count)
+        return lambda: pool.draw(surface)
+
+
+@benchmark("full_frame")
+def bench_full_frame():
+    """One frame the way main() draws it: background, particles, entities, snake, HUD, flip."""
+    screen = pygame.display.get_surface()
+    atlas = SpriteAtlas()
+    atlas.prebake()
+    snake_layer = SnakeLayer(atlas)
+    layers = StaticLayers(screen.get_size())
+    text_cache = TextCache()
+    font = pygame.font.Font(None, 20)
+    particles = full_pool(200)
+    snake = cycle_cells()[99::-1]
+    frame = [0]
+
+    def draw():
+        frame[0] += 1
+        screen.blit(layers.background(frame[0] / 60), (0, 0))
+        particles.draw(screen)
+        atlas.draw_powerup(screen, (20, 15), POWERUP_DOUBLE, frame[0] * 0.05)
+        atlas.draw_food(screen, (25, 5), FOOD_SPECIAL, 0.0, frame[0] * 0.04)
+        snake_layer.draw(screen, snake, RIGHT)
+        screen.blit(layers.score_panel, (10, 10))
+        screen.blit(text_cache.render(font, "Score: 123", True, TEXT_WHITE), (20, 15))
+        pygame.display.flip()
+    return draw
+
+
+def measure(function, min_time=MIN_TIME, repeats=REPEATS):
+    """Median and minimum nanoseconds per call over repeats timed batches."""
+    # Calibrate the batch size so each repeat takes about min_time / repeats
+    calls = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            function()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed * repeats >= min_time * 1e9 / 4 or calls >= 1 << 20:
+            break
+        calls *= 2
+    calls = max(1, int(calls * min_time * 1e9 / repeats / max(elapsed, 1)))
+    per_call = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            function()
+        per_call.append((time.perf_counter_ns() - start) / calls)
+    return {"median_ns": statistics.median(per_call), "min_ns": min(per_call), "calls": calls}
+
+
+def format_ns(ns):
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+
+def run(filters=(), min_time=MIN_TIME):
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    results = {}
+    for name, setup in BENCHMARKS:
+        if filters and not any(text in name for text in filters):
+            continue
+        results[name] = measure(setup(), min_time)
+        print(f"{name:40} {format_ns(results[name]['median_ns']):>12}", flush=True)
+    pygame.quit()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print changes against baseline results; return the names that regressed.
+
+    Compares the fastest repeat, which is far less noisy than the median on a
+    busy machine.
+    """
+    regressions = []
+    print(f"\n{'benchmark (best of repeats)':40} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, now = baseline[name]["min_ns"], result["min_ns"]
+        change = now / before - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:40} {format_ns(before):>12} {format_ns(now):>12} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark simulation and rendering hot paths headless")
+    parser.add_argument("--filter", action="append", default=[], metavar="TEXT",
+                        help="only run benchmarks whose name contains TEXT (repeatable)")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="seconds to time each benchmark")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fail --compare when a benchmark is this much slower (0.2 = 20%%)")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, _ in BENCHMARKS:
+            print(name)
+        return
+    results = run(args.filter, args.min_time)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "meta": {"python": platform.python_version(), "pygame": pygame.version.ver,
+                         "numpy": np.__version__, "platform": platform.platform(),
+                         "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+                "results": results,
+            }, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
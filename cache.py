@@ -0,0 +1,57 @@
+"""Small bounded caches shared by the renderer."""
+
+import collections
+
+
+class LRUCache:
+    """Mapping that holds at most maxsize entries, evicting the least recently used."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            return entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        entries = self.entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class TextCache:
+    """Rendered text surfaces keyed by (font, text, antialias, color), LRU bounded.
+
+    Glyph rasterization then only happens when a HUD value actually changes.
+    """
+
+    def __init__(self, maxsize=128):
+        self.cache = LRUCache(maxsize)
+
+    def render(self, font, text, antialias, color):
+        """Same arguments as font.render, with the font first."""
+        key = (font, text, antialias, color)
+        surface = self.cache.get(key)
+        if surface is None:
+            surface = font.render(text, antialias, color)
+            self.cache.put(key, surface)
+        return surface
@@ -0,0 +1,90 @@
+"""Buffered turn input and input latency tracking.
+
+Keys are queued as they arrive and the game takes one queued turn per snake
+move, so two quick turns inside one move interval (up, then left) both
+happen, on consecutive moves, instead of the second overwriting the first.
+
+InputLatency times each queued turn from the moment the key was read to the
+move that applied it and to the first frame shown after that move.
+"""
+
+import collections
+import time
+
+MAX_QUEUED_TURNS = 3  # Further keys are dropped until a move takes one
+LATENCY_SAMPLES = 4096  # Latencies kept per measurement for percentiles
+
+
+class TurnQueue:
+    """Turns waiting for the snake's next moves, oldest first."""
+
+    def __init__(self, size=MAX_QUEUED_TURNS):
+        self.turns = collections.deque()  # (direction, read time in ns)
+        self.size = size
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self.turns)
+
+    def push(self, direction, current, read_ns=None):
+        """Queue a turn unless it repeats or reverses the direction the queue leaves the snake in.
+
+        current is the snake's direction now; the check is against the last
+        queued turn, since that is the direction the snake will have when
+        this one is taken.
+        """
+        dx, dy = self.turns[-1][0] if self.turns else current
+        if direction in ((dx, dy), (-dx, -dy)):
+            return False
+        if len(self.turns) >= self.size:
+            self.dropped += 1
+            return False
+        self.turns.append((direction, time.perf_counter_ns() if read_ns is None else read_ns))
+        return True
+
+    def pop(self):
+        """The next (direction, read time in ns), or None when no turn is waiting."""
+        return self.turns.popleft() if self.turns else None
+
+    def clear(self):
+        self.turns.clear()
+
+
+class InputLatency:
+    """Key-to-move and key-to-display latencies of applied turns."""
+
+    def __init__(self):
+        self.to_move = collections.deque(maxlen=LATENCY_SAMPLES)  # Nanoseconds
+        self.to_display = collections.deque(maxlen=LATENCY_SAMPLES)
+        # (game tick, read time) of turns moved but not yet on screen, oldest first; a deque so
+        # a simulation thread can add to it while the render thread takes from it
+        self.unshown = collections.deque()
+
+    def moved(self, read_ns, tick=None):
+        """A turn read at read_ns was applied just now, by the move on game tick tick."""
+        self.to_move.append(time.perf_counter_ns() - read_ns)
+        self.unshown.append((tick, read_ns))
+
+    def displayed(self, tick=None):
+        """A frame just reached the screen, showing every move up to game tick tick (all of them by default)."""
+        unshown = self.unshown
+        if unshown:
+            now = time.perf_counter_ns()
+            while unshown and (tick is None or unshown[0][0] <= tick):
+                self.to_display.append(now - unshown.popleft()[1])
+
+    def stats(self):
+        """Turn count and latency percentiles in milliseconds."""
+        def percentiles(samples):
+            samples = sorted(samples)
+
+            def percentile(q):
+                return samples[min(len(samples) - 1, len(samples) * q // 100)] / 1e6 if samples else 0.0
+
+            return percentile(50), percentile(99), percentile(100)
+
+        move_p50, move_p99, move_max = percentiles(self.to_move)
+        display_p50, display_p99, display_max = percentiles(self.to_display)
+        return {"turns": len(self.to_move),
+                "move_p50_ms": move_p50, "move_p99_ms": move_p99, "move_max_ms": move_max,
+                "display_p50_ms": display_p50, "display_p99_ms": display_p99, "display_max_ms": display_max}
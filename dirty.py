@@ -0,0 +1,153 @@
+"""Dirty-rectangle rendering for the game window.
+
+Instead of filling and flipping the whole screen every frame, DirtyRenderer
+restores only the regions that changed from the cached background, redraws
+what lies inside them and pushes just those rects with display.update().
+
+The snake is tracked incrementally: every segment gets a serial number when
+it becomes the head, so a move only touches the new head, the old head, the
+vacated tail and the few cells where the quantized body gradient shifts.
+"""
+
+import pygame
+
+from render import CELL_SIZE
+
+
+def cell_rect(cell):
+    x, y = cell
+    return pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
+
+class DirtyRenderer:
+    """Tracks changed screen regions and redraws only those."""
+
+    def __init__(self, screen, atlas):
+        self.screen = screen
+        self.atlas = atlas
+        self.background = None
+        self.previous = []  # Regions drawn over the background last frame
+        self.dirty = []  # Rects to push this frame
+        self.full = True  # Whether this frame redraws the whole screen
+        self.redraw_cells = set()  # Snake cells restored this frame and needing a redraw
+
+        # Snake tracking: cell -> serials of the segments there (oldest first), serial -> cell
+        self.cells = {}
+        self.serials = {}
+        self.head_serial = -1
+        self.head = None
+        self.length = 0
+        self.direction = None
+
+    def reset(self):
+        """Forget the tracked snake, e.g. after a restart."""
+        self.head = None
+        self.length = 0
+
+    def begin(self, background, snake, direction, regions, force_full=False):
+        """Start a frame and restore every region that will change.
+
+        regions are the rects this frame's dynamic layers (particles, food,
+        power-up, HUD) will draw into; None entries are ignored. Returns True
+        when the whole screen was reset and must be redrawn in full.
+        """
+        regions = [rect for rect in regions if rect]
+        changed = self._track_snake(snake, direction)
+        self.full = force_full or changed is None or background is not self.background
+        self.background = background
+        if self.full:
+            self.screen.blit(background, (0, 0))
+            self.previous = regions
+            return True
+
+        dirty = self.previous + regions + [cell_rect(cell) for cell in changed]
+        # Snake segments under a restored region must be redrawn whole, so restore their full cells
+        cells = {cell for cell in changed if cell in self.cells}
+        for rect in dirty:
+            cells.update(self._cells_in(rect))
+        dirty.extend(cell_rect(cell) for cell in cells)
+        for rect in dirty:
+            self.screen.blit(background, rect, rect)
+        self.redraw_cells = cells
+        self.dirty = dirty
+        self.previous = regions
+        return False
+
+    def draw_snake(self, snake, direction):
+        """Draw the snake: all of it on a full frame, otherwise only the restored cells."""
+        if self.full:
+            self.atlas.draw_snake(self.screen, snake, direction)
+            return
+        total = len(snake)
+        atlas = self.atlas
+        head_serial = self.head_serial
+        # Where segments overlap, draw newest first so the oldest ends up on top like a full redraw
+        self.screen.blits([(atlas.segment(head_serial - serial, total, direction),
+                            (cell[0] * CELL_SIZE, cell[1] * CELL_SIZE))
+                           for cell in self.redraw_cells for serial in reversed(self.cells[cell])],
+                          doreturn=False)
+
+    def present(self):
+        """Push this frame to the display."""
+        if self.full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.dirty)
+
+    def _cells_in(self, rect):
+        """Snake cells overlapping rect."""
+        cells = self.cells
+        found = []
+        for cx in range(rect.left // CELL_SIZE, (rect.right - 1) // CELL_SIZE + 1):
+            for cy in range(rect.top // CELL_SIZE, (rect.bottom - 1) // CELL_SIZE + 1):
+                if (cx, cy) in cells:
+                    found.append((cx, cy))
+        return found
+
+    def _rebuild(self, snake):
+        """Re-number every segment from scratch (after a restart or missed move)."""
+        self.cells = {}
+        self.serials = {}
+        for serial, cell in enumerate(reversed(snake)):
+            self.cells.setdefault(cell, []).append(serial)
+            self.serials[serial] = cell
+        self.head_serial = len(snake) - 1
+
+    def _track_snake(self, snake, direction):
+        """Update segment tracking; return the cells whose look changed, or None for a full redraw."""
+        total = len(snake)
+        head = snake[0] if total else None
+        previous_head, previous_length, previous_direction = self.head, self.length, self.direction
+        self.head, self.length, self.direction = head, total, direction
+
+        if head == previous_head and total == previous_length:
+            # Only a turn can change the head sprite between moves
+            return set() if direction == previous_direction else {head}
+
+        if not (previous_length and total >= 2 and snake[1] == previous_head
+                and total in (previous_length, previous_length + 1)):
+            self._rebuild(snake)
+            return None
+
+        # Exactly one move since the last frame
+        self.head_serial += 1
+        self.cells.setdefault(head, []).append(self.head_serial)
+        self.serials[self.head_serial] = head
+        if total != previous_length:
+            # The snake grew, so the whole body gradient was rescaled
+            return None
+
+        changed = {head, previous_head}
+        tail_serial = self.head_serial - total
+        tail = self.serials.pop(tail_serial)
+        stack = self.cells[tail]
+        stack.pop(0)  # The tail is always the oldest segment in its cell
+        if not stack:
+            del self.cells[tail]
+        changed.add(tail)
+
+        # Each remaining segment moved one index down the gradient; only the steps' edges change color
+        serials, head_serial = self.serials, self.head_serial
+        for index in self.atlas.gradient_edges(total):
+            changed.add(serials[head_serial - index])
+        return changed
@@ -0,0 +1,101 @@
+"""Timed effects scheduled by expiry time.
+
+TimedEffects keeps every running effect in a heap ordered by when it ends,
+so advancing the clock only looks at the effects that are due: an effect
+costs nothing per step until it expires, however many are running. An
+effect is started under a key with a stacking rule for when the key is
+already running, and the optional callbacks fire when a key starts and when
+it ends.
+
+The clock is whatever the caller passes as now; SnakeGame uses seconds of
+game time, summed from step dt, so the same steps always expire effects on
+the same step.
+"""
+
+import heapq
+import itertools
+
+# Stacking rules for starting a key that is already running
+REFRESH = 0  # Restart at the full duration (the classic power-up rule)
+EXTEND = 1  # Add the duration to the time left
+STACK = 2  # Run alongside: each start expires on its own and stacks() counts them
+IGNORE = 3  # Keep the running effect as it is
+
+
+class TimedEffects:
+    """Running effects by key, expired in time order by advance()."""
+
+    def __init__(self, on_start=None, on_expire=None):
+        self.on_start = on_start  # on_start(key) when a key that wasn't running starts
+        self.on_expire = on_expire  # on_expire(key) when a key's last instance ends
+        self.heap = []  # (expiry, serial, key); entries no longer in self.running are skipped
+        self.running = {}  # key -> {serial: expiry} of its live instances
+        self.serials = itertools.count()
+
+    def __contains__(self, key):
+        return key in self.running
+
+    def __len__(self):
+        return len(self.running)
+
+    def start(self, key, duration, now, rule=REFRESH):
+        """Start key for duration from now, applying rule if it is already running."""
+        instances = self.running.get(key)
+        if not instances:
+            self.running[key] = instances = {}
+            self._add(key, instances, now + duration)
+            if self.on_start:
+                self.on_start(key)
+        elif rule == STACK:
+            self._add(key, instances, now + duration)
+        elif rule != IGNORE:
+            expiry = max(instances.values())
+            instances.clear()  # Their heap entries go stale
+            self._add(key, instances, now + duration if rule == REFRESH else expiry + duration)
+
+    def cancel(self, key):
+        """Stop key without calling on_expire."""
+        self.running.pop(key, None)
+
+    def clear(self):
+        self.heap.clear()
+        self.running.clear()
+
+    def expiry(self, key):
+        """When key's last instance ends, or None if it isn't running."""
+        instances = self.running.get(key)
+        return max(instances.values()) if instances else None
+
+    def remaining(self, key, now):
+        """Time until key ends (0.0 when it isn't running)."""
+        expiry = self.expiry(key)
+        return max(expiry - now, 0.0) if expiry is not None else 0.0
+
+    def pending(self, key, now):
+        """Whether key is still running at now, even if advance() hasn't reached now yet."""
+        expiry = self.expiry(key)
+        return expiry is not None and expiry > now
+
+    def stacks(self, key):
+        return len(self.running.get(key, ()))
+
+    def advance(self, now):
+        """Expire every instance due by now; returns the keys that ended, in expiry order."""
+        heap = self.heap
+        ended = []
+        while heap and heap[0][0] <= now:
+            _, serial, key = heapq.heappop(heap)
+            instances = self.running.get(key)
+            if instances is None or instances.pop(serial, None) is None:
+                continue  # Refreshed, extended or cancelled since
+            if not instances:
+                del self.running[key]
+                ended.append(key)
+                if self.on_expire:
+                    self.on_expire(key)
+        return ended
+
+    def _add(self, key, instances, expiry):
+        serial = next(self.serials)
+        instances[serial] = expiry
+        heapq.heappush(self.heap, (expiry, serial, key))
@@ -0,0 +1,114 @@
+"""Offscreen frame export for clips and visual regression checks.
+
+Frames are drawn into a small ring of plain Surfaces. A finished frame is
+handed to background writer threads through a bounded queue and its
+Surface comes back to the ring once written, so the renderer never copies
+pixels or touches the disk; it only waits when every Surface is still
+queued, i.e. when the disk is persistently slower than rendering.
+
+Writers produce one of:
+
+- a .bgr0 file: the Surfaces' own 32-bit pixels written straight from
+  Surface.get_view, with no conversion or copy (ffmpeg -pix_fmt bgr0)
+- a .rgb or .raw file, or "-" for stdout: packed RGB24 (ffmpeg -pix_fmt rgb24)
+- any other path: a directory of numbered PNGs
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+
+import pygame
+
+QUEUE_DEPTH = 8  # Frames that can wait for the writers before rendering blocks
+PNG_WRITERS = 2  # PNG encoding is slow; frames go to several threads (raw uses one, in order)
+PNG_NAME = "frame_{:06d}.png"
+NATIVE_MASKS = (0xFF0000, 0xFF00, 0xFF, 0)  # Little-endian bytes B, G, R, 0: the usual display format
+
+
+class FrameExporter:
+    """Ring of offscreen Surfaces drained by writer threads."""
+
+    def __init__(self, path, size, depth=QUEUE_DEPTH):
+        self.path = path
+        self.native = path.endswith(".bgr0")
+        self.raw = self.native or path == "-" or path.endswith((".rgb", ".raw"))
+        if self.raw:
+            self.file = sys.stdout.buffer if path == "-" else open(path, "wb")
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.file = None
+        self.free = queue.Queue()
+        for _ in range(depth + 1):
+            self.free.put(pygame.Surface(size, 0, 32, NATIVE_MASKS))
+        self.pending = queue.Queue(maxsize=depth)
+        self.frames = 0  # Frames submitted
+        self.written = 0
+        self.stall_ns = 0  # Time the renderer spent waiting for a free Surface
+        self.error = None
+        self.lock = threading.Lock()
+        self.threads = [threading.Thread(target=self._write_frames, daemon=True)
+                        for _ in range(1 if self.raw else PNG_WRITERS)]
+        for thread in self.threads:
+            thread.start()
+
+    def acquire(self):
+        """A Surface to draw the next frame into; blocks only while all of them are queued."""
+        self._raise_error()
+        try:
+            return self.free.get_nowait()
+        except queue.Empty:
+            start = time.perf_counter_ns()
+            surface = self.free.get()
+            self.stall_ns += time.perf_counter_ns() - start
+            return surface
+
+    def submit(self, surface):
+        """Queue a finished frame; the Surface must not be drawn to until acquired again."""
+        self.pending.put((self.frames, surface))
+        self.frames += 1
+
+    def close(self):
+        """Wait for every queued frame to be written and release the output."""
+        for _ in self.threads:
+            self.pending.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.file and self.file is not sys.stdout.buffer:
+            self.file.close()
+        elif self.file:
+            self.file.flush()
+        self._raise_error()
+
+    def _raise_error(self):
+        if self.error:
+            raise RuntimeError(f"frame export to {self.path} failed") from self.error
+
+    def _write_frames(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            index, surface = item
+            try:
+                if self.error is None:
+                    self._write(index, surface)
+            except Exception as error:
+                self.error = error
+            # Hand the Surface back even after an error, so the renderer never deadlocks
+            self.free.put(surface)
+
+    def _write(self, index, surface):
+        if self.native:
+            view = surface.get_view("2")  # Locks the Surface while the pixels are written
+            self.file.write(view)
+            del view
+        elif self.raw:
+            # Packing in C is about twice as fast as transposing a surfarray.pixels3d view
+            self.file.write(pygame.image.tobytes(surface, "RGB"))
+        else:
+            pygame.image.save(surface, os.path.join(self.path, PNG_NAME.format(index)))
+        with self.lock:
+            self.written += 1
@@ -0,0 +1,59 @@
+"""Lazily loaded fonts that render text from a glyph atlas.
+
+GlyphFont renders each character once, in white, and builds strings by
+copying those glyphs side by side and tinting the result, so the font file
+is only opened when a character isn't in the atlas yet. The atlas goes into
+the asset cache (see ``assets.py``), so a warm start draws its HUD without
+loading a font at all. Strings are laid out glyph by glyph, without kerning.
+"""
+
+import pygame
+
+WHITE = (255, 255, 255)
+
+
+class GlyphFont:
+    """Drop-in for the pygame.font.Font.render calls the HUD makes."""
+
+    def __init__(self, size, bold=False, assets=None):
+        self.size = size
+        self.bold = bold
+        self.assets = assets  # AssetCache to take baked glyphs from
+        self.font = None  # Opened on the first glyph the atlas lacks
+        self.glyphs = {}  # Character -> white glyph Surface with per-pixel alpha
+
+    def _load_font(self):
+        try:
+            self.font = pygame.font.Font(None, self.size)
+        except Exception:
+            self.font = pygame.font.SysFont("arial", self.size, bold=self.bold)
+        return self.font
+
+    def glyph(self, char):
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = self.assets.get(("glyph", self.size, self.bold, char)) if self.assets else None
+            if glyph is None:
+                glyph = (self.font or self._load_font()).render(char, True, WHITE)
+            self.glyphs[char] = glyph
+        return glyph
+
+    def render(self, text, antialias, color):
+        """Same as pygame.font.Font.render without a background; text is always antialiased."""
+        glyphs = [self.glyph(char) for char in text]
+        height = max((glyph.get_height() for glyph in glyphs), default=0)
+        if not glyphs:
+            height = (self.font or self._load_font()).get_height()
+        surface = pygame.Surface((sum(glyph.get_width() for glyph in glyphs), height), pygame.SRCALPHA)
+        surface.fill((*WHITE, 0))
+        x = 0
+        for glyph in glyphs:
+            # Glyphs don't overlap, so taking the maximum copies each one exactly
+            surface.blit(glyph, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            x += glyph.get_width()
+        surface.fill((*color[:3], 255), special_flags=pygame.BLEND_RGBA_MULT)
+        return surface
+
+    def sheet(self):
+        """Baked glyphs as {("glyph", size, bold, char): Surface} for the asset cache."""
+        return {("glyph", self.size, self.bold, char): glyph for char, glyph in self.glyphs.items()}
@@ -0,0 +1,361 @@
+"""Headless snake simulation core.
+
+Holds every game rule (movement, wall/self collision, food scoring, power-up
+pickup, timers and the difficulty ramp) with no dependency on pygame, so it
+can be stepped from the window in ``main.py`` or from scripts and bots.
+
+Power-up effects and board timers are scheduled by expiry on the game clock
+(see ``effects.py``), so nothing is counted down per step while they run.
+"""
+
+import collections
+import random
+
+from effects import TimedEffects, REFRESH
+
+# Config
+GRID_WIDTH = 30
+GRID_HEIGHT = 20
+GAME_SPEED = 8  # Snake moves per second (slower for easier gameplay)
+DIFFICULTY_STEP = 20  # Every 20 points = +1 speed
+DIFFICULTY_CAP = 10  # Maximum speed bonus from score
+SPEED_BOOST = 1.8  # Speed power-up: 80% faster
+SLOW_MOTION = 0.5  # Slow power-up: 50% slower
+
+# Food types
+FOOD_NORMAL = 0
+FOOD_BONUS = 1  # 3x points
+FOOD_SPECIAL = 2  # 5x points, rare
+FOOD_COUNT = 3
+FOOD_POINTS = (1, 3, 5)  # Points per food type, before multipliers
+FOOD_SPECIAL_CHANCE = 0.08  # 8% chance for special (was 5%)
+FOOD_BONUS_CHANCE = 0.25  # 25% chance for special or bonus (was 15%)
+
+# Power-up types
+POWERUP_SPEED = 0
+POWERUP_SLOW = 1
+POWERUP_DOUBLE = 2
+POWERUP_INVINCIBLE = 3
+POWERUP_COUNT = 4
+
+# Power-up effect durations in seconds (longer durations for easier gameplay)
+POWERUP_DURATIONS = {
+    POWERUP_SPEED: 7.0,       # was 5
+    POWERUP_SLOW: 8.0,        # was 5
+    POWERUP_DOUBLE: 12.0,     # was 8
+    POWERUP_INVINCIBLE: 6.0,  # was 4
+}
+POWERUP_SPAWN_INTERVAL = 8.0  # Seconds between spawn attempts (was 10)
+POWERUP_SPAWN_CHANCE = 0.75  # 75% chance to spawn (was 60%)
+POWERUP_LIFETIME = 20.0  # Seconds a power-up stays on the board (was 15)
+# What picking up a power-up whose effect is still running does (see effects.py)
+POWERUP_STACKING = {
+    POWERUP_SPEED: REFRESH,
+    POWERUP_SLOW: REFRESH,
+    POWERUP_DOUBLE: REFRESH,
+    POWERUP_INVINCIBLE: REFRESH,
+}
+
+# Directions
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)  # Index is the direction code used by batch engines
+
+# Events returned by SnakeGame.step
+EVENT_FOOD = 0  # (EVENT_FOOD, position, food_type, points)
+EVENT_POWERUP = 1  # (EVENT_POWERUP, position, powerup_type)
+EVENT_DEATH = 2  # (EVENT_DEATH, position, cause)
+EVENT_WIN = 3  # (EVENT_WIN, position): the snake filled the board
+EVENT_EXPIRE = 4  # (EVENT_EXPIRE, powerup_type): a power-up effect ran out
+
+# Board timer keys
+TIMER_SPAWN = 0  # Cooldown before the next power-up spawn attempt
+TIMER_POWERUP = 1  # Lifetime of the power-up on the board
+
+# Death causes
+DEATH_WALL = 0
+DEATH_SELF = 1
+
+
+def random_food_position(snake, exclude_positions=None, rng=random):
+    """Generate random food position, excluding snake and other positions.
+
+    Stateless helper for one-off placement; SnakeGame keeps a FreeCells index
+    instead. Returns None when no cell is free.
+    """
+    exclude = set(snake)
+    if exclude_positions:
+        exclude.update(exclude_positions)
+    # Rejection sampling is fast while the board is mostly empty
+    for _ in range(32):
+        pos = (rng.randint(0, GRID_WIDTH - 1), rng.randint(0, GRID_HEIGHT - 1))
+        if pos not in exclude:
+            return pos
+    free = [(x, y) for y in range(GRID_HEIGHT) for x in range(GRID_WIDTH) if (x, y) not in exclude]
+    return rng.choice(free) if free else None
+
+
+class FreeCells:
+    """Set of free cell indices with O(1) add, remove and uniform random draw.
+
+    Cells live in a dense list; slots maps each cell to its index in that list
+    (-1 when the cell is taken) so removal can swap with the last entry.
+    """
+
+    def __init__(self, size):
+        self.cells = list(range(size))
+        self.slots = list(range(size))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return self.slots[cell] >= 0
+
+    def remove(self, cell):
+        slot = self.slots[cell]
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[slot] = last
+            self.slots[last] = slot
+        self.slots[cell] = -1
+
+    def add(self, cell):
+        self.slots[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def choice(self, rng, exclude=()):
+        """Draw a random free cell not in exclude, or None if there is none."""
+        cells = self.cells
+        if len(cells) > len(exclude):
+            # At least one draw in two succeeds, so this is O(1) expected
+            while True:
+                cell = cells[rng.randrange(len(cells))]
+                if cell not in exclude:
+                    return cell
+        remaining = [cell for cell in cells if cell not in exclude]
+        return rng.choice(remaining) if remaining else None
+
+
+class SnakeGame:
+    """Complete state of one game, advanced with step()."""
+
+    # Keep the time past each move instead of dropping it, for a fixed-rate caller
+    # (the --threaded simulation) whose ticks don't line up with the move interval
+    carry_move_time = False
+
+    def __init__(self, seed=None):
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Start a new game. The same seed always produces the same game."""
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.snake = collections.deque([(GRID_WIDTH // 2, GRID_HEIGHT // 2), (GRID_WIDTH // 2 - 1, GRID_HEIGHT // 2), (GRID_WIDTH // 2 - 2, GRID_HEIGHT // 2)])
+        # Segments per cell, row-major; above 1 only while invincibility lets the snake cross itself
+        self.occupancy = bytearray(GRID_WIDTH * GRID_HEIGHT)
+        self.free_cells = FreeCells(GRID_WIDTH * GRID_HEIGHT)
+        for segment in self.snake:
+            self._occupy(segment)
+        self.direction = RIGHT
+        self.food = self._spawn_position()
+        self.food_type = FOOD_NORMAL
+        self.powerup = None  # (position, type, expiry time)
+        self.score = 0
+        self.score_multiplier = 1
+        self.current_game_speed = GAME_SPEED
+        self.game_over = False
+        self.won = False  # Set when the board is full and no food can spawn
+        self.move_timer = 0.0  # Timer for snake movement (frame-rate independent)
+        self.ticks = 0  # Number of step() calls since reset
+        self.time = 0.0  # Seconds of game time since reset, the clock for the timers below
+
+        self.effects = TimedEffects()  # Running power-up effects, keyed by power-up type
+        self.board_timers = TimedEffects(on_expire=self._board_timer_expired)
+        self.board_timers.start(TIMER_SPAWN, POWERUP_SPAWN_INTERVAL, self.time)
+
+    # Seconds left on each power-up effect (0.0 when it isn't running)
+    powerup_speed_timer = property(lambda self: self.effects.remaining(POWERUP_SPEED, self.time))
+    powerup_slow_timer = property(lambda self: self.effects.remaining(POWERUP_SLOW, self.time))
+    powerup_double_timer = property(lambda self: self.effects.remaining(POWERUP_DOUBLE, self.time))
+    powerup_invincible_timer = property(lambda self: self.effects.remaining(POWERUP_INVINCIBLE, self.time))
+
+    def turn(self, direction):
+        """Change direction unless it would reverse the snake onto itself."""
+        dx, dy = self.direction
+        if direction != (-dx, -dy):
+            self.direction = direction
+
+    def step(self, action=None, dt=1.0 / 60):
+        """Advance the game by dt seconds, optionally turning first.
+
+        Returns a list of event tuples (EVENT_FOOD, EVENT_POWERUP,
+        EVENT_DEATH, EVENT_WIN, EVENT_EXPIRE) so a front end can add effects
+        without re-deriving them.
+        """
+        if action is not None:
+            self.turn(action)
+        events = []
+        self.ticks += 1
+        previous = self.time
+        self.time += dt
+        now = self.time
+
+        # Expire power-up effects that ran out
+        effects = self.effects
+        for powerup_type in effects.advance(now):
+            events.append((EVENT_EXPIRE, powerup_type))
+
+        # Update score multiplier
+        self.score_multiplier = 1
+        if POWERUP_DOUBLE in effects:
+            self.score_multiplier = 2
+
+        # Update game speed based on power-ups and score
+        self.current_game_speed = self._game_speed(now)
+
+        if self.game_over:
+            return events
+
+        # Frame-rate independent snake movement
+        self.move_timer += dt
+        move_interval = 1.0 / self.current_game_speed  # Time between moves
+        if self.move_timer >= move_interval:
+            if self.carry_move_time:
+                # A long stall still only buys one catch-up move
+                self.move_timer = min(self.move_timer - move_interval, move_interval)
+            else:
+                self.move_timer = 0.0
+            self._move(events, previous)
+
+        # Spawn power-ups randomly (more frequent for easier gameplay)
+        board_timers = self.board_timers
+        if not self.powerup and not board_timers.pending(TIMER_SPAWN, now):
+            if self.rng.random() < POWERUP_SPAWN_CHANCE:
+                powerup_type = self.rng.randint(0, POWERUP_COUNT - 1)
+                powerup_pos = self._spawn_position([self.food] if self.food else None)
+                if powerup_pos is not None:
+                    # The lifetime counts from the start of this step, as the spawn cooldown restarts now
+                    expiry = previous + POWERUP_LIFETIME
+                    self.powerup = (powerup_pos, powerup_type, expiry)
+                    board_timers.start(TIMER_SPAWN, POWERUP_SPAWN_INTERVAL, now)
+                    board_timers.start(TIMER_POWERUP, POWERUP_LIFETIME, previous)
+
+        # Remove a power-up whose lifetime ran out
+        board_timers.advance(now)
+        return events
+
+    def move_due(self, dt):
+        """Whether step(None, dt) will move the snake, so input can be sampled just before it."""
+        if self.game_over:
+            return False
+        now = self.time + dt
+        return self.move_timer + dt >= 1.0 / self._game_speed(now)
+
+    def _game_speed(self, now):
+        """Moves per second at time now, from the score and the effects still running then."""
+        speed_multiplier = 1.0
+        if self.effects.pending(POWERUP_SPEED, now):
+            speed_multiplier = SPEED_BOOST
+        elif self.effects.pending(POWERUP_SLOW, now):
+            speed_multiplier = SLOW_MOTION
+
+        # Increase difficulty with score (slower progression)
+        difficulty_bonus = min(self.score // DIFFICULTY_STEP, DIFFICULTY_CAP)
+        return (GAME_SPEED + difficulty_bonus) * speed_multiplier
+
+    def is_occupied(self, pos):
+        """Whether a snake segment covers pos, in constant time."""
+        x, y = pos
+        return 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT and self.occupancy[y * GRID_WIDTH + x] > 0
+
+    def _occupy(self, pos):
+        x, y = pos
+        # Segments outside the board (only possible while invincible) are not tracked
+        if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT:
+            cell = y * GRID_WIDTH + x
+            if not self.occupancy[cell]:
+                self.free_cells.remove(cell)
+            self.occupancy[cell] += 1
+
+    def _vacate(self, pos):
+        x, y = pos
+        if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT:
+            cell = y * GRID_WIDTH + x
+            self.occupancy[cell] -= 1
+            if not self.occupancy[cell]:
+                self.free_cells.add(cell)
+
+    def _board_timer_expired(self, key):
+        if key == TIMER_POWERUP:
+            self.powerup = None
+
+    def _spawn_position(self, exclude_positions=None):
+        """Pick a free cell for food or a power-up, or None if the board is full."""
+        exclude = [y * GRID_WIDTH + x for x, y in exclude_positions] if exclude_positions else ()
+        cell = self.free_cells.choice(self.rng, exclude)
+        if cell is None:
+            return None
+        return (cell % GRID_WIDTH, cell // GRID_WIDTH)
+
+    def _move(self, events, previous):
+        """Move the snake one cell, resolving collisions and pickups; previous is the time before this step."""
+        snake = self.snake
+        head_x, head_y = snake[0]
+        dx, dy = self.direction
+        new_head = (head_x + dx, head_y + dy)
+
+        # Check collisions with walls (skip if invincible)
+        if POWERUP_INVINCIBLE not in self.effects:
+            if not (0 <= new_head[0] < GRID_WIDTH and 0 <= new_head[1] < GRID_HEIGHT):
+                self.game_over = True
+                events.append((EVENT_DEATH, new_head, DEATH_WALL))
+                return
+            # Check collisions with self
+            elif self.occupancy[new_head[1] * GRID_WIDTH + new_head[0]]:
+                self.game_over = True
+                events.append((EVENT_DEATH, new_head, DEATH_SELF))
+                return
+
+        # Allow movement even if collision (invincibility or walls)
+        snake.appendleft(new_head)
+        self._occupy(new_head)
+
+        # Check food collision
+        if new_head == self.food:
+            # Calculate points based on food type
+            points = FOOD_POINTS[self.food_type] * self.score_multiplier
+            self.score += points
+            events.append((EVENT_FOOD, new_head, self.food_type, points))
+
+            # Spawn new food with random type (more special foods for easier gameplay)
+            rand = self.rng.random()
+            if rand < FOOD_SPECIAL_CHANCE:
+                self.food_type = FOOD_SPECIAL
+            elif rand < FOOD_BONUS_CHANCE:
+                self.food_type = FOOD_BONUS
+            else:
+                self.food_type = FOOD_NORMAL
+
+            self.food = self._spawn_position([self.powerup[0]] if self.powerup else None)
+            if self.food is None:
+                # Nowhere left to put food: the snake filled the board
+                self.game_over = True
+                self.won = True
+                events.append((EVENT_WIN, new_head))
+        # Check power-up collision
+        elif self.powerup and new_head == self.powerup[0]:
+            powerup_type = self.powerup[1]
+
+            # Apply power-up effect
+            self.effects.start(powerup_type, POWERUP_DURATIONS[powerup_type], self.time, POWERUP_STACKING[powerup_type])
+            events.append((EVENT_POWERUP, new_head, powerup_type))
+
+            self.powerup = None
+            self.board_timers.cancel(TIMER_POWERUP)
+            # The cooldown counts from the start of the step that picked it up
+            self.board_timers.start(TIMER_SPAWN, POWERUP_SPAWN_INTERVAL, previous)
+        else:
+            self._vacate(snake.pop())
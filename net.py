@@ -0,0 +1,376 @@
+"""Wire protocol for server.py and the client side of it.
+
+Every message is a binary payload, sent over TCP with a u16 little-endian
+length prefix or as one binary WebSocket message.
+
+Client to server:
+    MSG_JOIN      room name (UTF-8); the first client in a room steers it,
+                  later ones watch
+    MSG_TURN      direction code (u8, index into DIRECTIONS)
+    MSG_RESTART   start a new game once the current one is over
+
+Server to client:
+    MSG_SNAPSHOT  the whole game, sent on joining and at every new game. The
+                  body is the head followed by one 2-bit direction code per
+                  segment, so even a board-filling snake stays small.
+    MSG_DELTA     ticks since the previous message (u16), then only what
+                  changed in them, as ops: one byte of opcode (high nibble)
+                  and argument (low nibble), some followed by a payload.
+                  A move is two bytes (OP_MOVE, OP_POP) whatever the board
+                  or snake size, and ticks where nothing changes send
+                  nothing.
+"""
+
+import collections
+import itertools
+import socket
+import struct
+import sys
+
+import game as game_rules
+from game import (
+    DIRECTIONS, POWERUP_SPEED, POWERUP_SLOW, POWERUP_DOUBLE, POWERUP_INVINCIBLE,
+    EVENT_FOOD, EVENT_POWERUP, EVENT_DEATH, EVENT_WIN, DEATH_WALL,
+)
+
+MSG_JOIN = 1
+MSG_TURN = 2
+MSG_RESTART = 3
+MSG_SNAPSHOT = 16
+MSG_DELTA = 17
+
+OP_MOVE = 0x10  # | direction code: push a head one cell that way
+OP_POP = 0x20  # Pop the tail
+OP_FOOD = 0x30  # | food type, then x, y (i16): food moved
+OP_NO_FOOD = 0x40
+OP_POWERUP = 0x50  # | power-up type, then x, y (i16): a power-up appeared
+OP_NO_POWERUP = 0x60  # Picked up or expired
+OP_SCORE = 0x70  # Then score (u32)
+OP_EFFECT = 0x80  # | power-up type, then remaining milliseconds (u16): an effect started
+OP_DIRECTION = 0x90  # | direction code: turned without moving yet
+OP_GAME_OVER = 0xA0  # | DEATH_WALL, DEATH_SELF or END_WON
+
+END_WON = 2
+NONE_X = -32768  # x of an absent food or power-up
+MAX_IDLE_TICKS = 0xFFFF  # A delta is sent at least this often, so the tick count fits
+POWERUP_TIMERS = (
+    (POWERUP_SPEED, "powerup_speed_timer"), (POWERUP_SLOW, "powerup_slow_timer"),
+    (POWERUP_DOUBLE, "powerup_double_timer"), (POWERUP_INVINCIBLE, "powerup_invincible_timer"),
+)
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+LENGTH = struct.Struct("<H")
+SNAPSHOT = struct.Struct("<BfHHBIBhhBhhB4HIhh")
+DELTA = struct.Struct("<BH")
+POSITION = struct.Struct("<hh")
+SCORE = struct.Struct("<I")
+MILLISECONDS = struct.Struct("<H")
+# A board-filling snake's snapshot must fit in one frame, and cells in an i16
+MAX_BOARD_CELLS = (0xFFFF - SNAPSHOT.size) * 4 + 1
+MAX_BOARD_SIDE = 0x7FFF
+
+
+def frame(payload):
+    """payload with its TCP length prefix."""
+    if len(payload) > 0xFFFF:
+        raise ValueError(f"message of {len(payload)} bytes is too long to frame")
+    return LENGTH.pack(len(payload)) + payload
+
+
+def read_frames(buffer):
+    """Pop every complete TCP-framed payload off the front of buffer (a bytearray)."""
+    payloads = []
+    start = 0
+    while len(buffer) - start >= 2:
+        size = buffer[start] | buffer[start + 1] << 8
+        if len(buffer) - start - 2 < size:
+            break
+        payloads.append(bytes(buffer[start + 2:start + 2 + size]))
+        start += 2 + size
+    del buffer[:start]
+    return payloads
+
+
+def check_board(width, height):
+    """Raise ValueError if a width x height board can't always be sent as a snapshot."""
+    if width > MAX_BOARD_SIDE or height > MAX_BOARD_SIDE or width * height > MAX_BOARD_CELLS:
+        raise ValueError(f"a {width}x{height} board is too big to send; the limit is "
+                         f"{MAX_BOARD_CELLS} cells and {MAX_BOARD_SIDE} per side")
+
+
+def _milliseconds(seconds):
+    return min(0xFFFF, int(seconds * 1000 + 0.5))
+
+
+def encode_snapshot(game, dt):
+    """The whole state of game, stepped dt seconds per tick."""
+    snake = game.snake
+    food_x, food_y = game.food if game.food else (NONE_X, 0)
+    powerup_x, powerup_y, powerup_type = (*game.powerup[0], game.powerup[1]) if game.powerup else (NONE_X, 0, 0)
+    flags = game.game_over | game.won << 1
+    head_x, head_y = snake[0]
+    out = bytearray(SNAPSHOT.pack(
+        MSG_SNAPSHOT, dt, game_rules.GRID_WIDTH, game_rules.GRID_HEIGHT, flags, game.score,
+        DIRECTION_CODES[game.direction], food_x, food_y, game.food_type, powerup_x, powerup_y, powerup_type,
+        *(_milliseconds(getattr(game, name)) for _, name in POWERUP_TIMERS), len(snake), head_x, head_y))
+    # Four segments per byte: the direction from each segment to the next one along the body
+    codes = 0
+    count = 0
+    previous = snake[0]
+    for segment in itertools.islice(snake, 1, None):
+        codes |= DIRECTION_CODES[(segment[0] - previous[0], segment[1] - previous[1])] << 2 * count
+        previous = segment
+        count += 1
+        if count == 4:
+            out.append(codes)
+            codes = count = 0
+    if count:
+        out.append(codes)
+    return bytes(out)
+
+
+class DeltaEncoder:
+    """Turns what one game's steps changed into MSG_DELTA payloads."""
+
+    def __init__(self, game):
+        self.game = game
+        self.sync()
+
+    def sync(self):
+        """Take the game's current state as what clients know, e.g. after a snapshot."""
+        game = self.game
+        self.head = game.snake[0]
+        self.length = len(game.snake)
+        self.food = (game.food, game.food_type)
+        self.powerup = game.powerup[:2] if game.powerup else None
+        self.score = game.score
+        self.direction = game.direction
+        self.timers = [getattr(game, name) for _, name in POWERUP_TIMERS]
+        self.game_over = game.game_over
+        self.ticks = 0  # Ticks since the last message
+
+    def delta(self, events=()):
+        """Call after every step with its events; the delta to send, or None when nothing changed."""
+        game = self.game
+        self.ticks += 1
+        ops = bytearray()
+        head = game.snake[0]
+        if head != self.head:
+            ops.append(OP_MOVE | DIRECTION_CODES[(head[0] - self.head[0], head[1] - self.head[1])])
+            if len(game.snake) == self.length:
+                ops.append(OP_POP)
+            self.head, self.length, self.direction = head, len(game.snake), game.direction
+        if game.score != self.score:
+            ops.append(OP_SCORE)
+            ops += SCORE.pack(game.score)
+            self.score = game.score
+        food = (game.food, game.food_type)
+        if food != self.food:
+            if game.food:
+                ops.append(OP_FOOD | game.food_type)
+                ops += POSITION.pack(*game.food)
+            else:
+                ops.append(OP_NO_FOOD)
+            self.food = food
+        powerup = game.powerup[:2] if game.powerup else None
+        if powerup != self.powerup:
+            if powerup:
+                ops.append(OP_POWERUP | powerup[1])
+                ops += POSITION.pack(*powerup[0])
+            else:
+                ops.append(OP_NO_POWERUP)
+            self.powerup = powerup
+        for i, (powerup_type, name) in enumerate(POWERUP_TIMERS):
+            timer = getattr(game, name)
+            if timer > self.timers[i]:
+                ops.append(OP_EFFECT | powerup_type)
+                ops += MILLISECONDS.pack(_milliseconds(timer))
+            self.timers[i] = timer
+        if game.direction != self.direction:
+            ops.append(OP_DIRECTION | DIRECTION_CODES[game.direction])
+            self.direction = game.direction
+        if game.game_over and not self.game_over:
+            end = END_WON if game.won else next(
+                (event[2] for event in events if event[0] == EVENT_DEATH), DEATH_WALL)
+            ops.append(OP_GAME_OVER | end)
+            self.game_over = True
+        if not ops and self.ticks < MAX_IDLE_TICKS:
+            return None
+        return self.flush(ops)
+
+    def flush(self, ops=b""):
+        """A delta carrying ops and the ticks since the last message, which restarts the count."""
+        payload = DELTA.pack(MSG_DELTA, self.ticks) + ops
+        self.ticks = 0
+        return payload
+
+
+class GameMirror:
+    """A server game rebuilt from its snapshots and deltas.
+
+    Has the attributes main() draws from a SnakeGame; apply() turns each
+    message into the events a local SnakeGame would have returned.
+    """
+
+    def __init__(self):
+        self.seed = None
+        self.ticks = 0
+        self.width = self.height = None  # Set by the first snapshot
+
+    def apply(self, payload, events):
+        """Apply one server message, appending its events to events."""
+        if payload[0] == MSG_SNAPSHOT:
+            self._apply_snapshot(payload)
+        elif payload[0] == MSG_DELTA:
+            self._apply_delta(payload, events)
+
+    def _occupy(self, pos, change):
+        x, y = pos
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.occupancy[y * self.width + x] += change
+
+    def _apply_snapshot(self, payload):
+        (_, self.dt, self.width, self.height, flags, self.score, direction, food_x, food_y, self.food_type,
+         powerup_x, powerup_y, powerup_type, *timers, length, head_x, head_y) = SNAPSHOT.unpack_from(payload)
+        self.game_over, self.won = bool(flags & 1), bool(flags & 2)
+        self.direction = DIRECTIONS[direction]
+        self.food = (food_x, food_y) if food_x != NONE_X else None
+        self.powerup = ((powerup_x, powerup_y), powerup_type, 0.0) if powerup_x != NONE_X else None
+        for (_, name), milliseconds in zip(POWERUP_TIMERS, timers):
+            setattr(self, name, milliseconds / 1000)
+        self.score_multiplier = 2 if self.powerup_double_timer > 0 else 1
+        self.occupancy = bytearray(self.width * self.height)
+        x, y = head_x, head_y
+        snake = [(x, y)]
+        codes = payload[SNAPSHOT.size:]
+        for i in range(length - 1):
+            dx, dy = DIRECTIONS[codes[i >> 2] >> 2 * (i & 3) & 3]
+            x += dx
+            y += dy
+            snake.append((x, y))
+        self.snake = collections.deque(snake)
+        for segment in snake:
+            self._occupy(segment, 1)
+
+    def _apply_delta(self, payload, events):
+        _, ticks = DELTA.unpack_from(payload)
+        self.ticks += ticks
+        for _, name in POWERUP_TIMERS:
+            setattr(self, name, max(0.0, getattr(self, name) - ticks * self.dt))
+        snake = self.snake
+        score = self.score
+        eaten = None
+        i = DELTA.size
+        while i < len(payload):
+            op = payload[i]
+            kind, argument = op & 0xF0, op & 0x0F
+            i += 1
+            if kind == OP_MOVE:
+                self.direction = dx, dy = DIRECTIONS[argument]
+                head = (snake[0][0] + dx, snake[0][1] + dy)
+                snake.appendleft(head)
+                self._occupy(head, 1)
+                if head == self.food:
+                    eaten = (head, self.food_type)
+                elif self.powerup and head == self.powerup[0]:
+                    events.append((EVENT_POWERUP, head, self.powerup[1]))
+            elif kind == OP_POP:
+                self._occupy(snake.pop(), -1)
+            elif kind == OP_SCORE:
+                (self.score,) = SCORE.unpack_from(payload, i)
+                i += SCORE.size
+            elif kind == OP_FOOD:
+                self.food = POSITION.unpack_from(payload, i)
+                self.food_type = argument
+                i += POSITION.size
+            elif kind == OP_NO_FOOD:
+                self.food = None
+            elif kind == OP_POWERUP:
+                self.powerup = (POSITION.unpack_from(payload, i), argument, 0.0)
+                i += POSITION.size
+            elif kind == OP_NO_POWERUP:
+                self.powerup = None
+            elif kind == OP_EFFECT:
+                (milliseconds,) = MILLISECONDS.unpack_from(payload, i)
+                setattr(self, POWERUP_TIMERS[argument][1], milliseconds / 1000)
+                i += MILLISECONDS.size
+            elif kind == OP_DIRECTION:
+                self.direction = DIRECTIONS[argument]
+            elif kind == OP_GAME_OVER:
+                self.game_over = True
+                head = snake[0]
+                if argument == END_WON:
+                    self.won = True
+                    events.append((EVENT_WIN, head))
+                else:
+                    dx, dy = self.direction
+                    events.append((EVENT_DEATH, (head[0] + dx, head[1] + dy), argument))
+        if eaten:
+            events.append((EVENT_FOOD, eaten[0], eaten[1], self.score - score))
+        self.score_multiplier = 2 if self.powerup_double_timer > 0 else 1
+
+
+class RemoteGame(GameMirror):
+    """Client-side mirror of a server game, a stand-in for SnakeGame in main().
+
+    step() applies whatever the server sent; turn() and reset() become
+    requests to the server, which stays the authority on the game.
+    """
+
+    def __init__(self, address, room="", timeout=5.0):
+        super().__init__()
+        self.sock = socket.create_connection(address, timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.buffer = bytearray()
+        self.connected = True
+        self._send(bytes([MSG_JOIN]) + room.encode())
+        # Block for the first snapshot, which sets the board size before the window opens
+        while self.width is None:
+            data = self.sock.recv(65536)
+            if not data:
+                raise ConnectionError("server closed the connection")
+            self.buffer += data
+            for payload in read_frames(self.buffer):
+                self.apply(payload, [])
+        self.sock.setblocking(False)
+
+    def close(self):
+        self.sock.close()
+        self.connected = False
+
+    def turn(self, direction):
+        """Ask the server to turn; the snake's direction changes once it says so."""
+        self._send(bytes([MSG_TURN, DIRECTION_CODES[direction]]))
+
+    def reset(self, seed=None):
+        """Ask the server for a new game (it picks the seed)."""
+        self._send(bytes([MSG_RESTART]))
+
+    def step(self, action=None, dt=None):
+        """Apply everything received since the last call; returns the resulting events."""
+        if action is not None:
+            self.turn(action)
+        events = []
+        while self.connected:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                data = b""
+            if not data:
+                print("server closed the connection", file=sys.stderr)
+                self.close()
+                self.game_over = True
+                break
+            self.buffer += data
+        for payload in read_frames(self.buffer):
+            self.apply(payload, events)
+        return events
+
+    def _send(self, payload):
+        if self.connected:
+            try:
+                self.sock.sendall(frame(payload))
+            except OSError:
+                self.close()
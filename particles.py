@@ -0,0 +1,141 @@
+"""Pooled particle system for food and power-up bursts.
+
+Particles live in fixed-capacity NumPy arrays (struct of arrays) and are
+updated in one vectorized pass per frame. Drawing uses circle sprites
+pre-rendered per (color, size, alpha bucket) and a single Surface.blits call,
+so no surfaces are allocated while the game runs. The sprites are made on
+the first draw, decoded from an AssetCache (``assets.py``) when one is given.
+"""
+
+import numpy as np
+import pygame
+
+MAX_PARTICLE_SIZE = 4  # Particles start between 2 and 4 pixels and only shrink
+ALPHA_BUCKETS = 16  # Alpha levels pre-rendered per color and size
+
+
+class ParticlePool:
+    """Fixed-capacity particle storage with batched update and draw."""
+
+    def __init__(self, palette, capacity=4096, seed=None, assets=None):
+        self.palette = [tuple(color[:3]) for color in palette]
+        self.color_index = {color: i for i, color in enumerate(self.palette)}
+        self.capacity = capacity
+        self.limit = capacity  # Live particles allowed; lowered to shed drawing work
+        self.rng = np.random.default_rng(seed)
+        self.count = 0  # Live particles occupy the first count slots
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.int32)
+        self.sprites = None  # Flattened (color, size, alpha bucket) circles, made when first needed
+        self.assets = assets
+
+    def __len__(self):
+        return self.count
+
+    def _sprite_keys(self):
+        return [("particle", color, size, bucket) for color in self.palette
+                for size in range(MAX_PARTICLE_SIZE + 1) for bucket in range(ALPHA_BUCKETS)]
+
+    def _render_sprites(self):
+        """Pre-render every (color, size, alpha bucket) circle, flattened for array lookup."""
+        sprites = []
+        for key in self._sprite_keys():
+            sprite = self.assets.get(key) if self.assets else None
+            if sprite is None:
+                _, color, size, bucket = key
+                alpha = int(255 * (bucket + 1) / ALPHA_BUCKETS)
+                sprite = pygame.Surface((max(size, 1) * 2, max(size, 1) * 2), pygame.SRCALPHA)
+                if size > 0:
+                    pygame.draw.circle(sprite, (*color, alpha), (size, size), size)
+            sprites.append(sprite)
+        return sprites
+
+    def prebake(self):
+        """Make the sprites now instead of on the first draw."""
+        if self.sprites is None:
+            self.sprites = self._render_sprites()
+
+    def sheet(self):
+        """The rendered sprites as {key: Surface} for the asset cache (empty before the first draw)."""
+        return dict(zip(self._sprite_keys(), self.sprites)) if self.sprites else {}
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, x, y, colors, count):
+        """Spawn count particles at (x, y), each with a random color from colors.
+
+        When the pool is full (or at its limit) the extra particles are dropped.
+        """
+        count = min(count, self.limit - self.count)
+        if count <= 0:
+            return
+        start, end = self.count, self.count + count
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vx[start:end] = self.rng.uniform(-2, 2, count)
+        self.vy[start:end] = self.rng.uniform(-2, 2, count)
+        self.life[start:end] = 1.0
+        self.size[start:end] = self.rng.uniform(2, 4, count)
+        indices = [self.color_index[tuple(color[:3])] for color in colors]
+        self.color[start:end] = self.rng.choice(indices, count)
+        self.count = end
+
+    def update(self, dt):
+        """Advance all particles by dt seconds and drop the dead ones."""
+        n = self.count
+        if n == 0:
+            return
+        step = dt * 60  # Scale by 60 to maintain original speed
+        self.x[:n] += self.vx[:n] * step
+        self.y[:n] += self.vy[:n] * step
+        self.vy[:n] += 0.1 * step  # Gravity
+        self.life[:n] -= 0.75 * dt  # Decay life
+        self.size[:n] *= 0.98 ** step  # Scale size decay
+
+        # Compact survivors to the front of the arrays
+        alive = self.life[:n] > 0
+        kept = int(np.count_nonzero(alive))
+        if kept < n:
+            for array in (self.x, self.y, self.vx, self.vy, self.life, self.size, self.color):
+                array[:kept] = array[:n][alive]
+            self.count = kept
+
+    def bounds(self):
+        """Rect covering every live particle, or None when there are none."""
+        n = self.count
+        if n == 0:
+            return None
+        pad = MAX_PARTICLE_SIZE + 1
+        left = int(self.x[:n].min()) - pad
+        top = int(self.y[:n].min()) - pad
+        right = int(self.x[:n].max()) + pad
+        bottom = int(self.y[:n].max()) + pad
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def draw(self, surface, offset=(0, 0)):
+        """Draw all particles with one Surface.blits call.
+
+        offset is subtracted from particle positions (a scrolling camera);
+        particles outside the surface are skipped.
+        """
+        n = self.count
+        if n == 0:
+            return
+        if self.sprites is None:
+            self.sprites = self._render_sprites()
+        sizes = self.size[:n].astype(np.int32)
+        buckets = np.minimum((self.life[:n] * ALPHA_BUCKETS).astype(np.int32), ALPHA_BUCKETS - 1)
+        keys = (self.color[:n] * (MAX_PARTICLE_SIZE + 1) + np.minimum(sizes, MAX_PARTICLE_SIZE)) * ALPHA_BUCKETS + buckets
+        left = (self.x[:n] - sizes).astype(np.int32) - offset[0]
+        top = (self.y[:n] - sizes).astype(np.int32) - offset[1]
+        width, height = surface.get_size()
+        visible = (sizes > 0) & (left < width) & (top < height) & (left > -2 * sizes) & (top > -2 * sizes)
+        sprites = self.sprites
+        surface.blits([(sprites[key], (px, py)) for key, px, py in zip(
+            keys[visible].tolist(), left[visible].tolist(), top[visible].tolist())], doreturn=False)
@@ -0,0 +1,179 @@
+"""Per-phase frame profiler for the main loop.
+
+The loop calls mark(phase) as each phase finishes; the time since the
+previous mark is charged to that phase. Frames are kept in a ring buffer of
+recent samples, shown as an overlay (frame time, p50/p99, per-phase bars,
+particle count, Surface allocations) and exportable as CSV or as Chrome
+trace-event JSON (load it in chrome://tracing or Perfetto).
+"""
+
+import collections
+import csv
+import json
+import threading
+import time
+
+import pygame
+
+# Loop phases in the order they run; "wait" is the time clock.tick() sleeps
+PHASES = ("input", "wait", "particles_update", "simulation", "background",
+          "particles_draw", "entities", "hud", "present")
+PHASE_COLORS = {
+    "input": (148, 163, 184), "wait": (71, 85, 105), "particles_update": (251, 191, 36),
+    "simulation": (34, 197, 94), "background": (59, 130, 246), "particles_draw": (255, 165, 0),
+    "entities": (239, 68, 68), "hud": (236, 72, 153), "present": (139, 92, 246),
+}
+SAMPLES = 600  # Frames kept for percentiles and export (10 s at 60 FPS)
+OVERLAY_REFRESH = 15  # Frames between overlay statistics updates, so drawing it stays cheap
+OVERLAY_SIZE = (210, 40 + 12 * len(PHASES))
+FRAME_BUDGET_NS = 1_000_000_000 // 60
+
+_Surface = pygame.Surface
+
+
+class _SurfaceType(type):
+    def __instancecheck__(cls, instance):
+        return isinstance(instance, _Surface)
+
+    def __subclasscheck__(cls, subclass):
+        return issubclass(subclass, _Surface)
+
+
+class _CountingSurface(_Surface, metaclass=_SurfaceType):
+    """Stands in for pygame.Surface while a frame is profiled, counting constructions.
+
+    Constructing one returns a plain pygame.Surface, and isinstance checks
+    against it behave as they do against pygame.Surface.
+    """
+
+    created = 0
+    thread = None  # Only Surfaces made on the profiled thread are counted
+
+    def __new__(cls, *args, **kwargs):
+        if threading.get_ident() == _CountingSurface.thread:
+            _CountingSurface.created += 1
+        return _Surface(*args, **kwargs)
+
+
+class FrameProfiler:
+    """Ring buffer of per-phase frame timings with an overlay and exporters.
+
+    Counting Surface allocations replaces pygame.Surface for the whole
+    process, but only between begin_frame() and end_frame(); close() always
+    puts the real class back.
+    """
+
+    def __init__(self, samples=SAMPLES, count_surfaces=True):
+        self.frames = collections.deque(maxlen=samples)  # (start ns, phase ns tuple, particles, surfaces)
+        self.index = {phase: i for i, phase in enumerate(PHASES)}
+        self.current = [0] * len(PHASES)
+        self.frame_start = self.last = 0
+        self.show_overlay = False
+        self.frame_count = 0
+        self.overlay_summary = None
+        self.overlay_lines = ()
+        # Counts Surface() calls made from Python; surfaces made inside C (font.render, copy) aren't seen
+        self.count_surfaces = count_surfaces
+        if count_surfaces:
+            _CountingSurface.thread = threading.get_ident()
+        self.surfaces_at_start = _CountingSurface.created
+
+    def close(self):
+        """Stop counting Surface allocations."""
+        pygame.Surface = _Surface
+
+    def begin_frame(self):
+        self.frame_start = self.last = time.perf_counter_ns()
+        self.current = [0] * len(PHASES)
+        self.surfaces_at_start = _CountingSurface.created
+        if self.count_surfaces:
+            pygame.Surface = _CountingSurface
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to phase."""
+        now = time.perf_counter_ns()
+        self.current[self.index[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self, particles=0):
+        pygame.Surface = _Surface
+        self.frames.append((self.frame_start, tuple(self.current), particles,
+                            _CountingSurface.created - self.surfaces_at_start))
+        self.frame_count += 1
+
+    def summary(self):
+        """Frame and busy (frame minus wait) p50/p99 plus mean per phase, all in ms."""
+        if not self.frames:
+            return None
+        wait = self.index["wait"]
+        totals = sorted(sum(phases) for _, phases, _, _ in self.frames)
+        busy = sorted(sum(phases) - phases[wait] for _, phases, _, _ in self.frames)
+
+        def percentile(values, q):
+            return values[min(len(values) - 1, len(values) * q // 100)] / 1e6
+
+        count = len(self.frames)
+        return {
+            "frame_p50": percentile(totals, 50), "frame_p99": percentile(totals, 99),
+            "busy_p50": percentile(busy, 50), "busy_p99": percentile(busy, 99),
+            "phases": {phase: sum(phases[i] for _, phases, _, _ in self.frames) / count / 1e6
+                       for phase, i in self.index.items()},
+        }
+
+    def overlay_rect(self, screen_width):
+        return pygame.Rect(screen_width - OVERLAY_SIZE[0] - 10, 10, *OVERLAY_SIZE)
+
+    def draw_overlay(self, surface, font, text_cache):
+        """Draw the stats panel in the top right corner."""
+        if not self.show_overlay or not self.frames:
+            return
+        if self.overlay_summary is None or self.frame_count % OVERLAY_REFRESH == 0:
+            # Text is refreshed with the statistics, so the overlay doesn't re-render glyphs every frame
+            summary = self.overlay_summary = self.summary()
+            _, last_phases, particles, surfaces = self.frames[-1]
+            self.overlay_lines = (
+                f"frame {sum(last_phases) / 1e6:5.1f} ms  p50 {summary['frame_p50']:4.1f}  p99 {summary['frame_p99']:4.1f}",
+                f"busy p50 {summary['busy_p50']:4.1f}  p99 {summary['busy_p99']:4.1f}  parts {particles}  surf {surfaces}")
+        summary = self.overlay_summary
+        rect = self.overlay_rect(surface.get_width())
+        surface.fill((15, 23, 42), rect)
+        y = rect.y + 4
+        for line in self.overlay_lines:
+            surface.blit(text_cache.render(font, line, True, (255, 255, 255)), (rect.x + 4, y))
+            y += 16
+        # One bar per phase, full width = a 60 FPS frame budget
+        bar_width = rect.width - 92
+        for phase in PHASES:
+            ms = summary["phases"][phase]
+            surface.blit(text_cache.render(font, phase, True, (203, 213, 225)), (rect.x + 4, y - 2))
+            width = min(bar_width, int(ms * 1e6 / FRAME_BUDGET_NS * bar_width))
+            surface.fill(PHASE_COLORS[phase], (rect.x + 88, y, max(width, 1), 8))
+            y += 12
+
+    def export(self, path):
+        """Write the buffered frames as CSV, or as Chrome trace JSON if path ends in .json."""
+        if path.endswith(".json"):
+            self.export_chrome_trace(path)
+        else:
+            self.export_csv(path)
+
+    def export_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame_start_ns", *(f"{phase}_ns" for phase in PHASES), "particles", "surfaces"])
+            for start, phases, particles, surfaces in self.frames:
+                writer.writerow([start, *phases, particles, surfaces])
+
+    def export_chrome_trace(self, path):
+        events = []
+        for start, phases, particles, surfaces in self.frames:
+            ts = start / 1000
+            events.append({"name": "frame", "ph": "X", "ts": ts, "dur": sum(phases) / 1000, "pid": 1, "tid": 1})
+            for phase, duration in zip(PHASES, phases):
+                # Phases run back to back in PHASES order, nested under the frame slice
+                events.append({"name": phase, "ph": "X", "ts": ts, "dur": duration / 1000, "pid": 1, "tid": 1})
+                ts += duration / 1000
+            events.append({"name": "counters", "ph": "C", "ts": start / 1000, "pid": 1,
+                           "args": {"particles": particles, "surfaces": surfaces}})
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
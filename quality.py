@@ -0,0 +1,94 @@
+"""Adaptive render quality that holds the frame-time budget.
+
+QualityGovernor watches how long each frame takes to simulate and draw (the
+clock wait excluded) and steps through levels that shed decoration, each
+keeping the savings of the levels before it:
+
+    0  full quality
+    1  particle bursts capped at PARTICLE_CAP live particles
+    2  one glow layer around food and the snake head instead of GLOW_LAYERS
+    3  no food sparkles
+    4  no grid pulse
+
+It drops a level as soon as one window of frames runs close to the budget,
+but only raises it again after several calm windows well under the budget,
+and needs more calm windows each time a raise had to be undone, so the
+level doesn't flip back and forth at a boundary.
+"""
+
+from render import FPS, GLOW_LAYERS
+
+QUALITY_NAMES = ("full", "capped particles", "single glow", "no sparkles", "no grid pulse")
+PARTICLE_CAP = 256  # Live particles allowed from level 1
+WINDOW = 30  # Frames per decision (half a second at 60 FPS)
+DEGRADE_AT = 0.9  # Lower quality when a window's p90 frame time exceeds this share of the budget
+RESTORE_AT = 0.6  # Count a window as calm when its p90 is under this share of the budget
+RESTORE_WINDOWS = 4  # Calm windows in a row before raising quality
+MAX_RESTORE_WINDOWS = 64
+
+
+class QualityGovernor:
+    """Picks a quality level from recent frame times, or holds a forced one."""
+
+    def __init__(self, level=None, budget_ms=1000 / FPS):
+        self.forced = level is not None
+        self.level = level or 0
+        self.budget_ns = budget_ms * 1e6
+        self.samples = []  # Frame times in the current window, in nanoseconds
+        self.calm = 0  # Calm windows in a row
+        self.restore_windows = RESTORE_WINDOWS
+        self.just_raised = False  # The last window raised quality
+        self.changes = 0
+
+    @property
+    def name(self):
+        return QUALITY_NAMES[self.level]
+
+    @property
+    def particle_limit(self):
+        return PARTICLE_CAP if self.level >= 1 else None
+
+    @property
+    def glow_layers(self):
+        return 1 if self.level >= 2 else GLOW_LAYERS
+
+    @property
+    def sparkles(self):
+        return self.level < 3
+
+    @property
+    def grid_pulse(self):
+        return self.level < 4
+
+    def frame(self, frame_ns):
+        """Record one frame's work time; returns True when the level changed."""
+        if self.forced:
+            return False
+        samples = self.samples
+        samples.append(frame_ns)
+        if len(samples) < WINDOW:
+            return False
+        samples.sort()
+        p90 = samples[len(samples) * 9 // 10]
+        samples.clear()
+        raised, self.just_raised = self.just_raised, False
+        if p90 > self.budget_ns * DEGRADE_AT:
+            self.calm = 0
+            if raised:
+                # The level just given back didn't fit: wait longer before trying it again
+                self.restore_windows = min(self.restore_windows * 2, MAX_RESTORE_WINDOWS)
+            if self.level < len(QUALITY_NAMES) - 1:
+                self.level += 1
+                self.changes += 1
+                return True
+        elif p90 < self.budget_ns * RESTORE_AT:
+            self.calm += 1
+            if self.calm >= self.restore_windows and self.level > 0:
+                self.calm = 0
+                self.level -= 1
+                self.changes += 1
+                self.just_raised = True
+                return True
+        else:
+            self.calm = 0
+        return False
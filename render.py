@@ -0,0 +1,369 @@
+"""Drawing config and primitives for the pygame front end.
+
+Everything here draws straight onto a surface; ``main.py`` decides what to
+draw each frame and ``sprites.py`` bakes these into reusable sprites.
+"""
+
+import math
+
+import pygame
+
+from game import (
+    GRID_WIDTH, GRID_HEIGHT, FOOD_NORMAL, FOOD_BONUS, FOOD_SPECIAL,
+    POWERUP_SPEED, POWERUP_SLOW, POWERUP_DOUBLE, POWERUP_INVINCIBLE,
+    UP, LEFT, RIGHT,
+)
+
+# Config
+CELL_SIZE = 20
+SCREEN_WIDTH = CELL_SIZE * GRID_WIDTH
+SCREEN_HEIGHT = CELL_SIZE * GRID_HEIGHT
+FPS = 60  # High FPS for smooth rendering
+BORDER_WIDTH = 3
+SCORE_PANEL_SIZE = (110, 50)
+GAME_OVER_PANEL_SIZE = (500, 150)
+HUD_AREA = (10, 10, 120, 90)  # Screen area the score panel and power-up timers draw into
+GRID_PULSE_FRAMES = 8  # Grid intensities baked by StaticLayers across the pulse
+GLOW_LAYERS = 3  # Glow layers around food and the snake head at full quality
+
+# Enhanced Color Palette
+BG_DARK = (15, 23, 42)  # Dark slate blue background
+BG_GRID = (30, 41, 59)  # Slightly lighter grid lines
+BORDER_COLOR = (148, 163, 184)  # Light gray border
+
+# Snake colors with gradient effect
+SNAKE_HEAD = (34, 197, 94)  # Bright green
+SNAKE_BODY_START = (22, 163, 74)  # Medium green
+SNAKE_BODY_END = (21, 128, 61)  # Dark green
+SNAKE_SHADOW = (16, 185, 129)  # Teal shadow
+
+# Food colors
+FOOD_COLOR = (239, 68, 68)  # Bright red
+FOOD_GLOW = (248, 113, 113)  # Light red glow
+FOOD_CORE = (220, 38, 38)  # Dark red core
+FOOD_SPARKLE = (255, 255, 255)  # White sparkle
+
+# UI colors
+TEXT_WHITE = (255, 255, 255)
+TEXT_GRAY = (203, 213, 225)
+UI_BG = (30, 41, 59, 200)  # Semi-transparent UI background
+TEXT_SHADOW = (0, 0, 0, 150)  # Text shadow
+
+# Game over colors
+OVERLAY_COLOR = (0, 0, 0, 180)
+GO_TEXT_COLOR = (239, 68, 68)
+GO_SUBTEXT_COLOR = (203, 213, 225)
+
+# Particle colors
+PARTICLE_COLOR = (255, 215, 0)  # Gold particles
+PARTICLE_COLORS = [
+    (255, 215, 0),  # Gold
+    (255, 165, 0),  # Orange
+    (255, 140, 0),  # Dark orange
+    (255, 200, 100),  # Light orange
+]
+
+# Power-up colors
+POWERUP_COLORS = {
+    POWERUP_SPEED: (59, 130, 246),      # Blue - speed boost
+    POWERUP_SLOW: (139, 92, 246),       # Purple - slow motion
+    POWERUP_DOUBLE: (251, 191, 36),     # Yellow - double points
+    POWERUP_INVINCIBLE: (236, 72, 153), # Pink - invincibility
+}
+
+def draw_rounded_rect(surface, rect, color, radius=4, border=0, border_color=None):
+    """Draw a rounded rectangle with optional border."""
+    if border > 0 and border_color:
+        # Draw border
+        pygame.draw.rect(surface, border_color, rect, border, border_radius=radius)
+    # Draw filled rounded rectangle
+    pygame.draw.rect(surface, color, rect.inflate(-border*2, -border*2) if border > 0 else rect, border_radius=radius)
+
+
+def grid_pulse_color(time=0, levels=None):
+    """Grid line color for the subtle pulsing effect at time seconds.
+
+    With levels, the pulse snaps to that many evenly spaced intensities.
+    """
+    wave = math.sin(time * 0.5)
+    if levels:
+        wave = round((wave + 1) / 2 * (levels - 1)) / (levels - 1) * 2 - 1
+    intensity = 0.5 + 0.1 * wave
+    return tuple(int(c * intensity) for c in BG_GRID)
+
+
+def draw_grid_background(surface, time=0, levels=None):
+    """Draw subtle animated grid lines on the background."""
+    grid_color = grid_pulse_color(time, levels)
+    width, height = surface.get_size()
+    
+    for x in range(0, width, CELL_SIZE):
+        pygame.draw.line(surface, grid_color, (x, 0), (x, height), 1)
+    for y in range(0, height, CELL_SIZE):
+        pygame.draw.line(surface, grid_color, (0, y), (width, y), 1)
+
+
+def draw_border(surface, rect=None):
+    """Draw the border around the game area, with an inner line for depth.
+
+    rect is the game area on surface; by default the whole surface.
+    """
+    border_rect = pygame.Rect(rect) if rect else surface.get_rect()
+    pygame.draw.rect(surface, BORDER_COLOR, border_rect, BORDER_WIDTH)
+    
+    # Draw inner border for depth
+    inner_border = border_rect.inflate(-BORDER_WIDTH * 2, -BORDER_WIDTH * 2)
+    pygame.draw.rect(surface, (BORDER_COLOR[0]//2, BORDER_COLOR[1]//2, BORDER_COLOR[2]//2), 
+                     inner_border, 1)
+
+
+def make_score_panel():
+    """Build the translucent score panel with its vertical fade."""
+    score_bg_width, score_bg_height = SCORE_PANEL_SIZE
+    score_bg = pygame.Surface((score_bg_width, score_bg_height), pygame.SRCALPHA)
+    for i in range(score_bg_height):
+        alpha = max(0, 200 - i * 4)
+        score_bg.fill((30, 41, 59, alpha), pygame.Rect(0, i, score_bg_width, 1))
+    return score_bg
+
+
+def make_game_over_panel():
+    """Build the rounded panel behind the game over text."""
+    panel = pygame.Surface(GAME_OVER_PANEL_SIZE, pygame.SRCALPHA)
+    panel.fill((30, 41, 59, 240))
+    pygame.draw.rect(panel, BORDER_COLOR, panel.get_rect(), 3, border_radius=10)
+    return panel
+
+
+class StaticLayers:
+    """Background, HUD panel and game over layers rendered once and reused.
+
+    The grid pulse is snapped to GRID_PULSE_FRAMES intensities, each baked
+    into its own full background with fill, grid and borders, so a frame
+    costs a single blit.
+    """
+
+    def __init__(self, size, border=True):
+        self.border = border  # False when the window scrolls over a larger world
+        self.invalidate(size)
+
+    def invalidate(self, size=None):
+        """Drop every cached layer, e.g. after the window is resized or colors change."""
+        if size is not None:
+            self.size = tuple(size)
+        self.backgrounds = {}  # grid color -> baked background
+        self.score_panel = make_score_panel()
+        self.game_over_panel = make_game_over_panel()
+        self.overlay = pygame.Surface(self.size, pygame.SRCALPHA)
+        self.overlay.fill(OVERLAY_COLOR)
+
+    def background(self, time=0):
+        """Full background (fill, pulsing grid and, unless disabled, borders) for time seconds."""
+        grid_color = grid_pulse_color(time, GRID_PULSE_FRAMES)
+        background = self.backgrounds.get(grid_color)
+        if background is None:
+            background = pygame.Surface(self.size)
+            if pygame.display.get_surface() is not None:
+                background = background.convert()
+            background.fill(BG_DARK)
+            draw_grid_background(background, time, GRID_PULSE_FRAMES)
+            if self.border:
+                draw_border(background)
+            self.backgrounds[grid_color] = background
+        return background
+
+
+def draw_snake_segment(surface, pos, is_head=False, segment_index=0, total_segments=1, direction=None,
+                       glow_layers=GLOW_LAYERS):
+    """Draw a snake segment with gradient effect and eyes on head (glow_layers of glow around it)."""
+    x, y = pos
+    base_x = x * CELL_SIZE
+    base_y = y * CELL_SIZE
+    
+    # Calculate gradient color for body segments
+    if is_head:
+        color = SNAKE_HEAD
+        shadow_color = SNAKE_SHADOW
+    else:
+        # Gradient from start to end color
+        ratio = segment_index / max(total_segments - 1, 1)
+        r1, g1, b1 = SNAKE_BODY_START
+        r2, g2, b2 = SNAKE_BODY_END
+        color = (
+            int(r1 + (r2 - r1) * ratio),
+            int(g1 + (g2 - g1) * ratio),
+            int(b1 + (b2 - b1) * ratio)
+        )
+        shadow_color = None
+    
+    # Draw glow effect for head (multiple layers for better glow)
+    if shadow_color and is_head:
+        for i in range(glow_layers, 0, -1):
+            glow_size = CELL_SIZE - i * 2
+            glow_x = base_x + (CELL_SIZE - glow_size) // 2
+            glow_y = base_y + (CELL_SIZE - glow_size) // 2
+            glow_rect = pygame.Rect(glow_x, glow_y, glow_size, glow_size)
+            glow_alpha = 50 // i
+            glow_surf = pygame.Surface((glow_size, glow_size), pygame.SRCALPHA)
+            glow_color_alpha = (*shadow_color[:3], glow_alpha)
+            pygame.draw.rect(glow_surf, glow_color_alpha, glow_surf.get_rect(), border_radius=5)
+            surface.blit(glow_surf, (glow_x, glow_y))
+    
+    # Draw main segment
+    cell_rect = pygame.Rect(base_x + 2, base_y + 2, CELL_SIZE - 4, CELL_SIZE - 4)
+    draw_rounded_rect(surface, cell_rect, color, radius=4, border=1, border_color=(max(0, color[0]-40), max(0, color[1]-40), max(0, color[2]-40)))
+    
+    # Draw highlight on segment
+    highlight_rect = pygame.Rect(base_x + 4, base_y + 4, CELL_SIZE // 3, CELL_SIZE // 3)
+    highlight_color = (min(255, color[0] + 30), min(255, color[1] + 30), min(255, color[2] + 30))
+    draw_rounded_rect(surface, highlight_rect, highlight_color, radius=2)
+    
+    # Draw eyes on head
+    if is_head and direction:
+        eye_size = 3
+        center_x = base_x + CELL_SIZE // 2
+        center_y = base_y + CELL_SIZE // 2
+        eye_offset = 4
+        
+        # Determine eye positions based on direction
+        if direction == RIGHT:
+            eye1_pos = (center_x + 2, center_y - eye_offset)
+            eye2_pos = (center_x + 2, center_y + eye_offset)
+        elif direction == LEFT:
+            eye1_pos = (center_x - 2, center_y - eye_offset)
+            eye2_pos = (center_x - 2, center_y + eye_offset)
+        elif direction == UP:
+            eye1_pos = (center_x - eye_offset, center_y - 2)
+            eye2_pos = (center_x + eye_offset, center_y - 2)
+        else:  # DOWN
+            eye1_pos = (center_x - eye_offset, center_y + 2)
+            eye2_pos = (center_x + eye_offset, center_y + 2)
+        
+        # Draw white eyes
+        pygame.draw.circle(surface, (255, 255, 255), eye1_pos, eye_size)
+        pygame.draw.circle(surface, (255, 255, 255), eye2_pos, eye_size)
+        
+        # Draw black pupils
+        pupil_size = 2
+        pygame.draw.circle(surface, (0, 0, 0), eye1_pos, pupil_size)
+        pygame.draw.circle(surface, (0, 0, 0), eye2_pos, pupil_size)
+
+
+def draw_food(surface, pos, food_type=FOOD_NORMAL, pulse=0.0, rotation=0.0, glow_layers=GLOW_LAYERS, sparkles=True):
+    """Draw food with glow effect, pulse animation, and sparkles. Different types have different colors.
+
+    glow_layers and sparkles trade the decoration for speed (see quality.py).
+    """
+    x, y = pos
+    base_x = x * CELL_SIZE
+    base_y = y * CELL_SIZE
+    center_x = base_x + CELL_SIZE // 2
+    center_y = base_y + CELL_SIZE // 2
+    
+    # Different colors for different food types
+    if food_type == FOOD_BONUS:
+        food_color = (255, 215, 0)  # Gold
+        food_glow = (255, 235, 100)  # Light gold
+        food_core = (255, 185, 0)  # Dark gold
+        sparkle_count = 6
+    elif food_type == FOOD_SPECIAL:
+        food_color = (168, 85, 247)  # Purple
+        food_glow = (196, 181, 253)  # Light purple
+        food_core = (139, 92, 246)  # Dark purple
+        sparkle_count = 8
+    else:
+        food_color = FOOD_COLOR
+        food_glow = FOOD_GLOW
+        food_core = FOOD_CORE
+        sparkle_count = 4
+    
+    # Pulse effect with smooth animation
+    pulse_offset = int(pulse * 2)
+    pulse_alpha = int(min(255, pulse * 80))
+    
+    # Draw animated outer glow (multiple layers)
+    for layer in range(glow_layers, 0, -1):
+        layer_offset = (pulse_offset + layer * 2)
+        layer_alpha = int((pulse_alpha + 40) / (layer + 1))
+        glow_size = CELL_SIZE - 8 + layer_offset * 2
+        
+        glow_surf = pygame.Surface((glow_size, glow_size), pygame.SRCALPHA)
+        glow_rect = pygame.Rect(0, 0, glow_size, glow_size)
+        glow_color_alpha = (*food_glow[:3], layer_alpha)
+        pygame.draw.rect(glow_surf, glow_color_alpha, glow_rect, border_radius=6)
+        surface.blit(glow_surf, (center_x - glow_size // 2, center_y - glow_size // 2))
+    
+    # Draw main food with gradient effect
+    food_size = CELL_SIZE - 12 + pulse_offset
+    food_surf = pygame.Surface((food_size, food_size), pygame.SRCALPHA)
+    food_rect = pygame.Rect(0, 0, food_size, food_size)
+    pygame.draw.rect(food_surf, food_color, food_rect, border_radius=5)
+    
+    # Add gradient highlight
+    highlight_rect = pygame.Rect(0, 0, food_size, food_size // 2)
+    highlight_color = (min(255, food_color[0] + 40), min(255, food_color[1] + 40), min(255, food_color[2] + 40), 100)
+    pygame.draw.rect(food_surf, highlight_color, highlight_rect, border_radius=5)
+    
+    surface.blit(food_surf, (center_x - food_size // 2, center_y - food_size // 2))
+    
+    # Draw rotating sparkles around food (more for special foods)
+    sparkle_radius = 8 + (food_type * 2)  # Bigger radius for special foods
+    for i in range(sparkle_count if sparkles else 0):
+        angle = rotation + (i * 2 * math.pi / sparkle_count)
+        sparkle_x = center_x + math.cos(angle) * sparkle_radius
+        sparkle_y = center_y + math.sin(angle) * sparkle_radius
+        sparkle_size = 2 + food_type  # Bigger sparkles for special foods
+        sparkle_alpha = int(150 + 50 * math.sin(rotation * 2 + i))
+        sparkle_surf = pygame.Surface((sparkle_size * 2, sparkle_size * 2), pygame.SRCALPHA)
+        sparkle_color_alpha = (*FOOD_SPARKLE[:3], sparkle_alpha)
+        pygame.draw.circle(sparkle_surf, sparkle_color_alpha, (sparkle_size, sparkle_size), sparkle_size)
+        surface.blit(sparkle_surf, (sparkle_x - sparkle_size, sparkle_y - sparkle_size))
+    
+    # Draw core highlight
+    core_size = 6 + food_type
+    core_rect = pygame.Rect(
+        center_x - core_size // 2,
+        center_y - core_size // 2,
+        core_size, core_size
+    )
+    draw_rounded_rect(surface, core_rect, food_core, radius=3)
+
+
+def draw_powerup(surface, pos, powerup_type, rotation=0.0):
+    """Draw a power-up with distinct visual style."""
+    x, y = pos
+    base_x = x * CELL_SIZE
+    base_y = y * CELL_SIZE
+    center_x = base_x + CELL_SIZE // 2
+    center_y = base_y + CELL_SIZE // 2
+    
+    color = POWERUP_COLORS[powerup_type]
+    
+    # Animated pulsing glow
+    pulse = math.sin(rotation * 2) * 2
+    
+    # Draw outer glow
+    glow_size = CELL_SIZE - 4 + int(pulse)
+    glow_surf = pygame.Surface((glow_size, glow_size), pygame.SRCALPHA)
+    glow_rect = pygame.Rect(0, 0, glow_size, glow_size)
+    glow_alpha = int(100 + 50 * math.sin(rotation * 3))
+    glow_color_alpha = (*color[:3], glow_alpha)
+    pygame.draw.rect(glow_surf, glow_color_alpha, glow_rect, border_radius=8)
+    surface.blit(glow_surf, (center_x - glow_size // 2, center_y - glow_size // 2))
+    
+    # Draw power-up shape (star-like)
+    powerup_size = CELL_SIZE - 8
+    powerup_surf = pygame.Surface((powerup_size, powerup_size), pygame.SRCALPHA)
+    points = []
+    for i in range(8):
+        angle = rotation * 2 + (i * 2 * math.pi / 8)
+        if i % 2 == 0:
+            radius = powerup_size // 2
+        else:
+            radius = powerup_size // 4
+        px = powerup_size // 2 + math.cos(angle) * radius
+        py = powerup_size // 2 + math.sin(angle) * radius
+        points.append((px, py))
+    
+    pygame.draw.polygon(powerup_surf, color, points)
+    surface.blit(powerup_surf, (center_x - powerup_size // 2, center_y - powerup_size // 2))
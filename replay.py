@@ -0,0 +1,231 @@
+"""Deterministic replays: seed plus direction changes per fixed tick.
+
+A game stepped with a fixed dt from a known seed is fully determined by the
+ticks at which the player turned, so a replay only stores those. The file is
+a small header followed by varint records, written and read as a stream so
+sessions of any length never have to fit in memory.
+
+File layout:
+    header   b"SNKR", version (u8), tick length in seconds (f64)
+    records  varint((ticks since previous record << 3) | kind)
+             kind 0-3: turn to DIRECTIONS[kind]
+             KIND_START: a new game begins; followed by varint(seed)
+             KIND_END: the game ended or recording stopped; followed by varint(score)
+
+Usage:
+    python replay.py verify session.snkr
+"""
+
+import argparse
+import struct
+import time
+
+from game import DIRECTIONS, SnakeGame
+
+MAGIC = b"SNKR"
+VERSION = 2  # 2: power-up timers moved to expiry times on the game clock
+HEADER = struct.Struct("<4sBd")
+FIXED_DT = 1.0 / 60  # Simulation tick length in fixed-timestep mode
+KIND_START = 4
+KIND_END = 5
+
+
+class ReplayError(Exception):
+    """Raised for malformed replay files."""
+
+
+def _write_varint(out, value):
+    data = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            data.append(byte | 0x80)
+        else:
+            data.append(byte)
+            return out.write(data)
+
+
+def _read_varint(stream):
+    """Read one varint, or return None at a clean end of file."""
+    value = 0
+    shift = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            if shift:
+                raise ReplayError("replay ends in the middle of a record")
+            return None
+        value |= (byte[0] & 0x7F) << shift
+        if byte[0] < 0x80:
+            return value
+        shift += 7
+
+
+class ReplayWriter:
+    """Streams a session's games to a replay file as they are played."""
+
+    def __init__(self, path, dt=FIXED_DT):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, dt))
+        self.last_tick = 0
+        self.in_game = False
+
+    def _record(self, tick, kind):
+        _write_varint(self.file, (tick - self.last_tick) << 3 | kind)
+        self.last_tick = tick
+
+    def start(self, seed):
+        """Begin a new game played from seed (a non-negative int)."""
+        if seed < 0:
+            raise ValueError("replay seeds must be non-negative")
+        self.last_tick = 0
+        self._record(0, KIND_START)
+        _write_varint(self.file, seed)
+        self.in_game = True
+
+    def turn(self, tick, direction):
+        """Record a turn applied after tick steps of the current game.
+
+        Turns between games (on the game over screen) cannot matter and are dropped.
+        """
+        if self.in_game:
+            self._record(tick, DIRECTIONS.index(direction))
+
+    def end(self, tick, score):
+        """Record that the current game ended (or stopped) after tick steps."""
+        if self.in_game:
+            self._record(tick, KIND_END)
+            _write_varint(self.file, score)
+            self.in_game = False
+
+    def close(self, tick=None, score=None):
+        """Close the file, ending an unfinished game at tick if given."""
+        if tick is not None:
+            self.end(tick, score)
+        self.file.close()
+
+
+def read_replay(path):
+    """Yield (kind, tick, value) records from a replay file, streaming from disk.
+
+    kind is a direction index (value is the direction), KIND_START (value is
+    the seed) or KIND_END (value is the recorded score). tick counts steps
+    since the start of the current game. The tick length is in the first
+    yielded record: ("dt", 0, seconds).
+    """
+    with open(path, "rb", buffering=64 * 1024) as stream:
+        header = stream.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ReplayError("file too short for a replay header")
+        magic, version, dt = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ReplayError(f"not a version {VERSION} snake replay")
+        yield ("dt", 0, dt)
+        tick = 0
+        while True:
+            value = _read_varint(stream)
+            if value is None:
+                return
+            kind = value & 0x7
+            tick = 0 if kind == KIND_START else tick + (value >> 3)
+            if kind in (KIND_START, KIND_END):
+                extra = _read_varint(stream)
+                if extra is None:
+                    raise ReplayError("replay ends in the middle of a record")
+                yield (kind, tick, extra)
+            elif kind < len(DIRECTIONS):
+                yield (kind, tick, DIRECTIONS[kind])
+            else:
+                raise ReplayError(f"unknown record kind {kind}")
+
+
+class ReplayPlayer:
+    """Feeds a replay's turns into a SnakeGame tick by tick."""
+
+    def __init__(self, path):
+        self.records = read_replay(path)
+        _, _, self.dt = next(self.records)
+        self.pending = next(self.records, None)
+        self.started = False
+        self.ended = True  # No game in progress until next_game()
+        self.score = None  # Recorded final score of the current game
+
+    def next_game(self):
+        """Move on to the next recorded game; returns False when there is none."""
+        self.ended = self.pending is None
+        self.score = None
+        return not self.ended
+
+    def apply(self, game):
+        """Apply every record due before the game's next step.
+
+        Returns False once the current game's recording has ended (the game
+        must not be stepped further).
+        """
+        while not self.ended:
+            record = self.pending
+            if record is None:
+                self.ended = True  # Truncated recording: the game was never closed
+                break
+            kind, tick, value = record
+            if kind == KIND_START:
+                if self.started:
+                    raise ReplayError("game start before the previous game ended")
+                game.reset(value)
+                self.started = True
+            elif not self.started:
+                raise ReplayError("record before the first game start")
+            elif tick > game.ticks:
+                break
+            elif kind == KIND_END:
+                self.score = value
+                self.started = False
+                self.ended = True
+            else:
+                game.turn(value)
+            self.pending = next(self.records, None)
+        return not self.ended
+
+
+def replay_games(path):
+    """Re-simulate every game in a replay headless, as fast as possible.
+
+    Yields (game, recorded score) per game; the recorded score is None for a
+    truncated recording.
+    """
+    player = ReplayPlayer(path)
+    game = SnakeGame()
+    dt = player.dt
+    while player.next_game():
+        while player.apply(game):
+            game.step(None, dt)
+        yield game, player.score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify snake replays headless")
+    parser.add_argument("command", choices=["verify"])
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    total_ticks = 0
+    mismatches = 0
+    for index, (game, recorded) in enumerate(replay_games(args.path)):
+        total_ticks += game.ticks
+        if recorded is None:
+            status = "truncated"
+        else:
+            status = "ok" if recorded == game.score else "MISMATCH"
+            mismatches += recorded != game.score
+        ending = "won" if game.won else "game over" if game.game_over else "stopped"
+        print(f"game {index}: seed {game.seed}, {game.ticks} ticks, "
+              f"score {recorded} -> {game.score} ({ending}) {status}")
+    elapsed = time.perf_counter() - start
+    print(f"{total_ticks} ticks replayed in {elapsed:.2f}s ({total_ticks / max(elapsed, 1e-9):,.0f} ticks/s)")
+    raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""Authoritative multiplayer server: many rooms, each running its own game.
+
+Each room steps one SnakeGame at a fixed tick rate on the asyncio loop. The
+first client to join a room steers its snake and later ones watch. Clients
+connect over plain TCP or WebSocket on the same port (a connection that
+opens with an HTTP GET is upgraded). Every tick's changes go out as one
+delta (see net.py), encoded once per room and shared by all its clients,
+so bandwidth and CPU follow what changed rather than the board size.
+
+Usage:
+    python server.py --port 8765
+    python main.py --connect localhost:8765 --room lobby
+    python server.py --load-test --rooms 200 --clients 4 --seconds 10
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import multiprocessing
+import os
+import random
+import socket
+import struct
+import time
+
+import game as game_rules
+from game import DIRECTIONS, SnakeGame
+from net import (
+    MSG_JOIN, MSG_TURN, MSG_RESTART, DeltaEncoder, GameMirror, check_board, encode_snapshot, frame,
+    read_frames,
+)
+
+TICK_RATE = 60  # Room ticks per second, the fixed timestep of main.py's --fixed mode
+MAX_CATCH_UP = 0.25  # Seconds a room may fall behind before it drops time instead of catching up
+MAX_BUFFERED = 1 << 20  # Bytes queued for one client before it is dropped as too slow
+MAX_HANDSHAKE = 8192  # Bytes of HTTP upgrade request accepted
+WEBSOCKET_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+LOAD_TEST_TURN_INTERVAL = 0.15  # Seconds between load-test bot inputs
+
+
+def _apply_mask(payload, mask):
+    """XOR payload with the repeating 4-byte WebSocket mask."""
+    size = len(payload)
+    key = int.from_bytes((mask * (size // 4 + 1))[:size], "big")
+    return (int.from_bytes(payload, "big") ^ key).to_bytes(size, "big")
+
+
+def websocket_frame(payload, mask=None):
+    """payload as one binary WebSocket frame; clients must pass a 4-byte mask."""
+    size = len(payload)
+    if size < 126:
+        header = bytes((0x82, size | (0x80 if mask else 0)))
+    elif size < 1 << 16:
+        header = struct.pack("!BBH", 0x82, 126 | (0x80 if mask else 0), size)
+    else:
+        header = struct.pack("!BBQ", 0x82, 127 | (0x80 if mask else 0), size)
+    if not mask:
+        return header + payload
+    return header + mask + _apply_mask(payload, mask)
+
+
+def read_websocket_frames(buffer):
+    """Pop every complete WebSocket frame off buffer as (opcode, unmasked payload)."""
+    frames = []
+    start = 0
+    while len(buffer) - start >= 2:
+        opcode, size = buffer[start] & 0x0F, buffer[start + 1] & 0x7F
+        masked = buffer[start + 1] & 0x80
+        offset = start + 2
+        if size == 126:
+            if len(buffer) < offset + 2:
+                break
+            (size,) = struct.unpack_from("!H", buffer, offset)
+            offset += 2
+        elif size == 127:
+            if len(buffer) < offset + 8:
+                break
+            (size,) = struct.unpack_from("!Q", buffer, offset)
+            offset += 8
+        mask = bytes(buffer[offset:offset + 4]) if masked else None
+        offset += 4 if masked else 0
+        if len(buffer) < offset + size:
+            break
+        payload = bytes(buffer[offset:offset + size])
+        frames.append((opcode, _apply_mask(payload, mask) if mask else payload))
+        start = offset + size
+    del buffer[:start]
+    return frames
+
+
+class Client(asyncio.Protocol):
+    """One connection: detects TCP or WebSocket, then feeds messages to its room."""
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.buffer = bytearray()
+        self.websocket = None  # Unknown until the first bytes arrive
+        self.upgraded = False  # WebSocket handshake answered
+        self.room = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def connection_lost(self, exc):
+        if self.room:
+            self.room.leave(self)
+
+    def data_received(self, data):
+        self.buffer += data
+        if self.websocket is None:
+            if len(self.buffer) < 4:
+                return
+            self.websocket = self.buffer.startswith(b"GET ")
+        if not self.websocket:
+            for payload in read_frames(self.buffer):
+                self.handle(payload)
+            return
+        if not self.upgraded and not self._upgrade():
+            return
+        for opcode, payload in read_websocket_frames(self.buffer):
+            if opcode == 0x2 and payload:
+                self.handle(payload)
+            elif opcode == 0x8:
+                self.transport.close()
+            elif opcode == 0x9:
+                self.transport.write(bytes((0x8A, len(payload))) + payload)
+
+    def _upgrade(self):
+        """Answer the HTTP upgrade request once it is complete; False while waiting for more."""
+        end = self.buffer.find(b"\r\n\r\n")
+        if end < 0:
+            if len(self.buffer) > MAX_HANDSHAKE:
+                self.transport.close()
+            return False
+        headers = {}
+        for line in bytes(self.buffer[:end]).split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            headers[name.strip().lower()] = value.strip()
+        del self.buffer[:end + 4]
+        key = headers.get(b"sec-websocket-key")
+        if not key:
+            self.transport.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            self.transport.close()
+            return False
+        accept = base64.b64encode(hashlib.sha1(key + WEBSOCKET_GUID).digest())
+        self.transport.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                             b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        self.upgraded = True
+        return True
+
+    def handle(self, payload):
+        if not payload:
+            return
+        kind = payload[0]
+        if kind == MSG_JOIN and self.room is None:
+            self.server.join(self, payload[1:].decode(errors="replace"))
+        elif self.room and self.room.clients[0] is self:
+            # Only the room's first client steers
+            if kind == MSG_TURN and len(payload) == 2 and payload[1] < len(DIRECTIONS):
+                self.room.game.turn(DIRECTIONS[payload[1]])
+            elif kind == MSG_RESTART:
+                self.room.restart()
+
+    def write(self, tcp, websocket):
+        """Queue one message, already framed both ways; drop clients that stop reading."""
+        transport = self.transport
+        if transport.is_closing():
+            return
+        transport.write(websocket if self.websocket else tcp)
+        self.server.bytes_sent += len(websocket if self.websocket else tcp)
+        if transport.get_write_buffer_size() > MAX_BUFFERED:
+            transport.abort()
+
+
+class Room:
+    """One authoritative game and the clients watching it."""
+
+    def __init__(self, server, name):
+        self.server = server
+        self.name = name
+        self.game = SnakeGame()
+        self.encoder = DeltaEncoder(self.game)
+        self.clients = []
+
+    def join(self, client):
+        client.room = self
+        if self.encoder.ticks:
+            # Bring everyone's tick count up to now so the newcomer's snapshot and the next delta agree
+            self.broadcast(self.encoder.flush())
+        snapshot = encode_snapshot(self.game, self.server.dt)
+        client.write(frame(snapshot), websocket_frame(snapshot))
+        self.clients.append(client)
+
+    def leave(self, client):
+        self.clients.remove(client)
+        if not self.clients and self.server.rooms.get(self.name) is self:
+            del self.server.rooms[self.name]
+
+    def restart(self):
+        if self.game.game_over:
+            self.game.reset()
+            self.encoder.sync()
+            self.broadcast(encode_snapshot(self.game, self.server.dt))
+
+    def broadcast(self, payload):
+        tcp, websocket = frame(payload), websocket_frame(payload)
+        for client in self.clients:
+            client.write(tcp, websocket)
+
+    def tick(self):
+        events = self.game.step(None, self.server.dt)
+        payload = self.encoder.delta(events)
+        if payload:
+            self.broadcast(payload)
+
+
+class Server:
+    """Rooms by name, created on first join and dropped when empty."""
+
+    def __init__(self, tick_rate=TICK_RATE):
+        self.dt = 1.0 / tick_rate
+        self.rooms = {}
+        self.ticks = 0
+        self.late_ticks = 0  # Ticks that started after their deadline
+        self.bytes_sent = 0
+
+    async def run(self):
+        """Tick every room at the fixed rate, catching up after short stalls.
+
+        One timer drives all rooms: a sleep per room per tick would cost more
+        than stepping the game.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            deadline += self.dt
+            delay = deadline - loop.time()
+            if delay < -MAX_CATCH_UP:
+                deadline = loop.time()  # Too far behind: drop time rather than spiral
+            if delay < 0:
+                self.late_ticks += len(self.rooms)
+            await asyncio.sleep(max(delay, 0))
+            for room in list(self.rooms.values()):
+                room.tick()
+            self.ticks += len(self.rooms)
+
+    def join(self, client, name):
+        room = self.rooms.get(name)
+        if room is None:
+            room = self.rooms[name] = Room(self, name)
+        room.join(client)
+
+    async def serve(self, host, port, ready=None):
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(lambda: Client(self), host, port)
+        if ready:
+            ready(server.sockets[0].getsockname()[1])
+        ticking = loop.create_task(self.run())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            ticking.cancel()
+
+
+def _load_test_server(tick_rate, world, connection):
+    """Child process: serve on a free port and report CPU use over the window the parent marks."""
+    game_rules.GRID_WIDTH, game_rules.GRID_HEIGHT = world
+    server = Server(tick_rate)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        serving = loop.create_task(server.serve("127.0.0.1", 0, connection.send))
+        await loop.run_in_executor(None, connection.recv)  # Start of the measured window
+        start = (time.perf_counter(), time.process_time(), server.ticks, server.late_ticks, server.bytes_sent)
+        await loop.run_in_executor(None, connection.recv)  # End of it
+        connection.send({
+            "wall": time.perf_counter() - start[0], "cpu": time.process_time() - start[1],
+            "ticks": server.ticks - start[2], "late_ticks": server.late_ticks - start[3],
+            "bytes": server.bytes_sent - start[4], "rooms": len(server.rooms),
+            "clients": sum(len(room.clients) for room in server.rooms.values()),
+        })
+        serving.cancel()
+
+    asyncio.run(main())
+
+
+class LoadClient(asyncio.Protocol):
+    """Load-test client: joins a room, mirrors its game and, if it steers, plays at random."""
+
+    def __init__(self, room, websocket):
+        self.room = room
+        self.websocket = websocket
+        self.upgraded = not websocket
+        self.buffer = bytearray()
+        self.mirror = GameMirror()
+        self.transport = None
+        self.received = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        if self.websocket:
+            key = base64.b64encode(os.urandom(16))
+            transport.write(b"GET / HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n"
+                            b"Connection: Upgrade\r\nSec-WebSocket-Version: 13\r\n"
+                            b"Sec-WebSocket-Key: " + key + b"\r\n\r\n")
+        self.send(bytes([MSG_JOIN]) + self.room.encode())
+
+    def send(self, payload):
+        self.transport.write(websocket_frame(payload, os.urandom(4)) if self.websocket else frame(payload))
+
+    def data_received(self, data):
+        self.received += len(data)
+        self.buffer += data
+        if not self.upgraded:
+            end = self.buffer.find(b"\r\n\r\n")
+            if end < 0:
+                return
+            del self.buffer[:end + 4]
+            self.upgraded = True
+        if self.websocket:
+            payloads = [payload for _, payload in read_websocket_frames(self.buffer)]
+        else:
+            payloads = read_frames(self.buffer)
+        for payload in payloads:
+            self.mirror.apply(payload, [])
+
+    def play(self, rng):
+        if self.mirror.width is None:
+            return
+        if self.mirror.game_over:
+            self.send(bytes([MSG_RESTART]))
+        elif rng.random() < 0.3:
+            self.send(bytes([MSG_TURN, rng.randrange(len(DIRECTIONS))]))
+
+
+def load_test(rooms, clients_per_room, seconds, tick_rate, websocket):
+    """Serve from a child process, drive it with loopback clients and report rooms and clients per core."""
+    connection, child_connection = multiprocessing.Pipe()
+    world = (game_rules.GRID_WIDTH, game_rules.GRID_HEIGHT)
+    process = multiprocessing.Process(target=_load_test_server, args=(tick_rate, world, child_connection),
+                                      daemon=True)
+    process.start()
+    port = connection.recv()
+
+    async def drive():
+        loop = asyncio.get_running_loop()
+        clients = []
+        for r in range(rooms):
+            for _ in range(clients_per_room):
+                _, client = await loop.create_connection(
+                    lambda: LoadClient(f"room{r}", websocket), "127.0.0.1", port)
+                clients.append(client)
+        drivers = clients[::clients_per_room]
+        rng = random.Random(0)
+        await asyncio.sleep(1.0)  # Let every room start before measuring
+        received = sum(client.received for client in clients)
+        connection.send("start")
+        end = loop.time() + seconds
+        while loop.time() < end:
+            for client in drivers:
+                client.play(rng)
+            await asyncio.sleep(LOAD_TEST_TURN_INTERVAL)
+        connection.send("stop")
+        report = await loop.run_in_executor(None, connection.recv)
+        report["received"] = sum(client.received for client in clients) - received
+        for client in clients:
+            client.transport.close()
+        return report
+
+    report = asyncio.run(drive())
+    process.join(timeout=5)
+    cores = report["cpu"] / report["wall"]
+    clients = report["clients"]
+    print(f"{report['rooms']} rooms, {clients} clients ({'WebSocket' if websocket else 'TCP'}), "
+          f"{tick_rate} ticks/s for {report['wall']:.1f}s")
+    print(f"server CPU {cores:.2f} cores, {report['late_ticks'] / max(report['ticks'], 1):.1%} of ticks late")
+    print(f"sent {report['bytes'] / report['wall'] / clients:.0f} B/s per client "
+          f"({report['received'] / report['wall'] / clients:.0f} B/s received)")
+    print(f"capacity: {report['rooms'] / cores:.0f} rooms per core, {clients / cores:.0f} clients per core")
+    if report["late_ticks"] > report["ticks"] * 0.01:
+        print("warning: the server fell behind; use fewer rooms for a valid per-core figure")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Authoritative multiplayer snake server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE, help="room ticks per second")
+    parser.add_argument("--world", type=lambda text: tuple(int(part) for part in text.lower().split("x")),
+                        metavar="WxH", help="board size in cells")
+    parser.add_argument("--load-test", action="store_true",
+                        help="serve on loopback, connect simulated clients and report capacity")
+    parser.add_argument("--rooms", type=int, default=100, help="load test rooms")
+    parser.add_argument("--clients", type=int, default=4, help="load test clients per room")
+    parser.add_argument("--seconds", type=float, default=10.0, help="load test duration")
+    parser.add_argument("--websocket", action="store_true", help="load test clients use WebSocket")
+    args = parser.parse_args()
+    if args.world:
+        try:
+            check_board(*args.world)
+        except ValueError as error:
+            parser.error(str(error))
+        game_rules.GRID_WIDTH, game_rules.GRID_HEIGHT = args.world
+
+    if args.load_test:
+        load_test(args.rooms, args.clients, args.seconds, args.tick_rate, args.websocket)
+        return
+    server = Server(args.tick_rate)
+    try:
+        asyncio.run(server.serve(args.host, args.port, lambda port: print(f"serving on {args.host}:{port}")))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
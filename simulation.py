@@ -0,0 +1,164 @@
+"""Game rules on their own fixed-rate thread, rendered from snapshots.
+
+SimulationThread steps a SnakeGame every FIXED_DT seconds of wall time,
+scheduled from a running deadline rather than from the previous tick, so
+the snake's move cadence stays exact however long the frames take to draw.
+After each tick it publishes an immutable Snapshot of everything the
+renderer reads into a SnapshotBuffer: a pair of the two latest snapshots,
+replaced by a single reference assignment, so the render thread never
+takes a lock and never sees a half-updated game.
+
+The renderer shows the game one tick in the past, interpolating between
+those two snapshots: the continuous values (the game clock and the effect
+timers) are blended, while the grid state (snake, food, power-up, score)
+comes from whichever snapshot is nearer, as cells can't be half entered.
+"""
+
+import collections
+import sys
+import threading
+import time
+
+from replay import FIXED_DT
+
+MAX_CATCH_UP = 8  # Ticks run back to back after a stall before the rest is dropped
+SWITCH_INTERVAL = 0.001  # Seconds a thread may hold the GIL while another waits (Python's default is 0.005)
+
+Snapshot = collections.namedtuple("Snapshot", (
+    "ticks", "time", "snake", "direction", "food", "food_type", "powerup", "score", "score_multiplier",
+    "current_game_speed", "powerup_speed_timer", "powerup_slow_timer", "powerup_double_timer",
+    "powerup_invincible_timer", "game_over", "won", "occupancy",
+))
+TIMER_FIELDS = ("time", "powerup_speed_timer", "powerup_slow_timer", "powerup_double_timer",
+                "powerup_invincible_timer")  # Blended between snapshots
+
+
+def snapshot(game):
+    """Copy of the state the renderer reads from game, safe to keep while the game moves on."""
+    return Snapshot(
+        game.ticks, game.time, tuple(game.snake), game.direction, game.food, game.food_type, game.powerup,
+        game.score, game.score_multiplier, game.current_game_speed, game.powerup_speed_timer,
+        game.powerup_slow_timer, game.powerup_double_timer, game.powerup_invincible_timer, game.game_over,
+        game.won, bytes(game.occupancy),
+    )
+
+
+def interpolate(previous, current, alpha):
+    """State alpha of the way from previous to current (0 is previous, 1 is current)."""
+    alpha = min(max(alpha, 0.0), 1.0)
+    nearer = current if alpha >= 0.5 else previous
+    return nearer._replace(**{field: getattr(previous, field) * (1 - alpha) + getattr(current, field) * alpha
+                              for field in TIMER_FIELDS})
+
+
+class SnapshotBuffer:
+    """The two latest snapshots with the wall times they stand for."""
+
+    def __init__(self, state, at):
+        self.pair = ((state, at), (state, at))
+
+    def publish(self, state, at):
+        # One assignment swaps both halves, so a reader always gets a matching pair
+        self.pair = (self.pair[1], (state, at))
+
+    def reset(self, state, at):
+        self.pair = ((state, at), (state, at))
+
+    def view(self, at):
+        """The state at wall time at, interpolated between the two snapshots around it."""
+        (previous, previous_at), (current, current_at) = self.pair
+        if current_at <= previous_at:
+            return current
+        return interpolate(previous, current, (at - previous_at) / (current_at - previous_at))
+
+
+class SimulationThread(threading.Thread):
+    """Steps game at a fixed rate, taking queued turns just before each move.
+
+    The render thread talks to it only through turn(), restart(),
+    drain_events() and view(); everything else belongs to this thread.
+    """
+
+    def __init__(self, game, turns, latency, autopilot=None, dt=FIXED_DT):
+        super().__init__(name="simulation", daemon=True)
+        self.game = game
+        game.carry_move_time = True  # Moves keep pace with the fixed ticks
+        self.turns = turns  # TurnQueue filled by the render thread
+        self.latency = latency
+        self.autopilot = autopilot
+        self.dt = dt
+        self.lock = threading.Lock()  # Held while the game changes
+        self.buffer = SnapshotBuffer(snapshot(game), time.perf_counter())
+        self.events = []  # Events since the last drain_events()
+        self.ticks = 0
+        self.late_ticks = 0  # Ticks that started more than a tick behind schedule
+        self.dropped_ticks = 0  # Ticks skipped after a stall longer than MAX_CATCH_UP ticks
+        self.running = True
+
+    def start(self):
+        # Hand the GIL over sooner, so a tick isn't held up behind the render thread's Python code
+        sys.setswitchinterval(SWITCH_INTERVAL)
+        super().start()
+
+    def run(self):
+        dt = self.dt
+        deadline = time.perf_counter()
+        while self.running:
+            now = time.perf_counter()
+            if now < deadline:
+                time.sleep(deadline - now)
+                continue
+            behind = int((now - deadline) / dt)
+            if behind >= MAX_CATCH_UP:
+                self.dropped_ticks += behind
+                deadline += behind * dt
+            elif behind:
+                self.late_ticks += 1
+            with self.lock:
+                self._tick()
+                self.buffer.publish(snapshot(self.game), deadline)
+            deadline += dt
+
+    def _tick(self):
+        game = self.game
+        if self.autopilot:
+            direction = self.autopilot.poll(game)
+            if direction is not None:
+                game.turn(direction)
+        if game.move_due(self.dt):
+            queued = self.turns.pop()
+            if queued:
+                direction, read_ns = queued
+                game.turn(direction)
+                self.latency.moved(read_ns, game.ticks + 1)
+        self.events.extend(game.step(None, self.dt))
+        self.ticks += 1
+
+    def turn(self, direction):
+        """Queue a turn read from the keyboard just now."""
+        with self.lock:
+            self.turns.push(direction, self.game.direction)
+
+    def restart(self, seed=None):
+        """Start a new game, dropping queued turns and events from the old one."""
+        with self.lock:
+            self.game.reset(seed)
+            self.turns.clear()
+            if self.autopilot:
+                self.autopilot.reset()
+            self.events.clear()
+            self.buffer.reset(snapshot(self.game), time.perf_counter())
+
+    def drain_events(self):
+        """Events of the ticks since the last call, oldest first."""
+        with self.lock:
+            events, self.events = self.events, []
+        return events
+
+    def view(self, now=None):
+        """The state to draw at wall time now: one tick in the past, between the two latest snapshots."""
+        return self.buffer.view((time.perf_counter() if now is None else now) - self.dt)
+
+    def stop(self):
+        self.running = False
+        self.join()
@@ -0,0 +1,236 @@
+"""Pre-rendered sprites for food, power-ups and snake segments.
+
+draw_food, draw_powerup and draw_snake_segment build several temporary
+surfaces per call. SpriteAtlas renders each look once, keyed by quantized
+animation state, so every entity costs one blit per frame. The glow layers
+composite onto the transparent sprite the same way they would onto the
+screen, so a baked sprite matches the direct draw calls to within rounding.
+
+The glow layers and sparkles baked into new sprites follow set_quality(), so
+a lower quality level costs nothing extra per frame once its sprites exist.
+With an AssetCache (``assets.py``), a missing sprite is decoded from the
+on-disk cache when it is there instead of being drawn.
+"""
+
+import collections
+import math
+
+import pygame
+
+from cache import LRUCache
+from game import FOOD_COUNT, POWERUP_COUNT, DIRECTIONS
+from render import CELL_SIZE, GLOW_LAYERS, draw_food, draw_powerup, draw_snake_segment
+
+ROTATION_BUCKETS = 32  # Rotation steps per full turn for food and power-ups
+PULSE_BUCKETS = 13  # Pulse steps between 0 and PULSE_MAX (0 stays exact)
+PULSE_MAX = 3.0  # Food pulse right after eating, decays to 0
+GRADIENT_STEPS = 32  # Body colors between SNAKE_BODY_START and SNAKE_BODY_END
+ENTITY_MARGIN = 1  # Cells of padding around food and power-ups for glow and sparkles
+MAX_SPRITES = 1024  # Default LRU bound on cached sprites
+
+TAU = 2 * math.pi
+
+
+class SpriteAtlas:
+    """Cache of pre-rendered entity sprites with LRU eviction."""
+
+    def __init__(self, max_sprites=MAX_SPRITES, rotation_buckets=ROTATION_BUCKETS,
+                 pulse_buckets=PULSE_BUCKETS, gradient_steps=GRADIENT_STEPS, assets=None):
+        self.cache = LRUCache(max_sprites)
+        self.assets = assets
+        self.rotation_buckets = rotation_buckets
+        self.pulse_buckets = pulse_buckets
+        self.gradient_steps = gradient_steps
+        self.entity_size = (2 * ENTITY_MARGIN + 1) * CELL_SIZE
+        self.glow_layers = GLOW_LAYERS  # Around food and the snake head
+        self.sparkles = True
+        # Gradient step of each segment index, and the indices where the step changes, for one
+        # snake length at a time: the length changes far less often than segments are drawn
+        self.gradient_length = None
+        self.gradient_table = []
+        self.gradient_changes = []
+
+    def set_quality(self, glow_layers, sparkles):
+        """Draw food and the snake head with this much decoration from now on."""
+        self.glow_layers = glow_layers
+        self.sparkles = sparkles
+
+    def prebake(self):
+        """Render the sprites used on almost every frame (no food pulse) up front."""
+        for food_type in range(FOOD_COUNT):
+            for rotation in range(self.rotation_buckets if self.sparkles else 1):
+                self._sprite(("food", food_type, 0, rotation, self.glow_layers, self.sparkles))
+        for powerup_type in range(POWERUP_COUNT):
+            for rotation in range(self.rotation_buckets):
+                self._sprite(("powerup", powerup_type, rotation))
+        for step in range(self.gradient_steps):
+            self._sprite(("segment", step, None))
+        for direction in DIRECTIONS:
+            self._sprite(("head", direction, self.glow_layers))
+
+    def sheet(self):
+        """Every cached sprite as {key: Surface}, for the asset cache."""
+        return dict(self.cache.entries)
+
+    def _rotation_bucket(self, rotation):
+        return int(rotation % TAU / TAU * self.rotation_buckets) % self.rotation_buckets
+
+    def _new_surface(self, size):
+        surf = pygame.Surface((size, size), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert_alpha()
+        surf.fill((0, 0, 0, 0))
+        return surf
+
+    def _sprite(self, key):
+        """Return the sprite for key, rendering it on a cache miss."""
+        sprite = self.cache.get(key)
+        if sprite is not None:
+            return sprite
+        sprite = self.assets.get(key) if self.assets else None
+        if sprite is not None:
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert_alpha()
+            self.cache.put(key, sprite)
+            return sprite
+        kind = key[0]
+        if kind == "food":
+            _, food_type, pulse_bucket, rotation_bucket, glow_layers, sparkles = key
+            sprite = self._new_surface(self.entity_size)
+            draw_food(sprite, (ENTITY_MARGIN, ENTITY_MARGIN), food_type,
+                      pulse_bucket * PULSE_MAX / (self.pulse_buckets - 1),
+                      rotation_bucket * TAU / self.rotation_buckets, glow_layers, sparkles)
+        elif kind == "powerup":
+            _, powerup_type, rotation_bucket = key
+            sprite = self._new_surface(self.entity_size)
+            draw_powerup(sprite, (ENTITY_MARGIN, ENTITY_MARGIN), powerup_type,
+                         rotation_bucket * TAU / self.rotation_buckets)
+        elif kind == "head":
+            _, direction, glow_layers = key
+            sprite = self._new_surface(CELL_SIZE)
+            draw_snake_segment(sprite, (0, 0), True, 0, 1, direction, glow_layers)
+        else:
+            _, step, _ = key
+            sprite = self._new_surface(CELL_SIZE)
+            draw_snake_segment(sprite, (0, 0), False, step, self.gradient_steps)
+        self.cache.put(key, sprite)
+        return sprite
+
+    def food(self, food_type, pulse=0.0, rotation=0.0):
+        pulse_bucket = int(min(pulse, PULSE_MAX) / PULSE_MAX * (self.pulse_buckets - 1) + 0.5)
+        # Only the sparkles rotate, so without them one rotation serves
+        rotation_bucket = self._rotation_bucket(rotation) if self.sparkles else 0
+        return self._sprite(("food", food_type, pulse_bucket, rotation_bucket, self.glow_layers, self.sparkles))
+
+    def powerup(self, powerup_type, rotation=0.0):
+        return self._sprite(("powerup", powerup_type, self._rotation_bucket(rotation)))
+
+    def gradient(self, total_segments):
+        """Gradient step of every segment index of a snake this long."""
+        if total_segments != self.gradient_length:
+            scale = (self.gradient_steps - 1) / max(total_segments - 1, 1)
+            table = [int(i * scale + 0.5) for i in range(total_segments)]
+            self.gradient_table = table
+            self.gradient_changes = [i for i in range(1, total_segments) if table[i] != table[i - 1]]
+            self.gradient_length = total_segments
+        return self.gradient_table
+
+    def gradient_step(self, segment_index, total_segments):
+        """Quantized gradient step for a body segment."""
+        return self.gradient(total_segments)[segment_index]
+
+    def gradient_edges(self, total_segments):
+        """Segment indices (from 1) whose gradient step differs from the segment before them."""
+        self.gradient(total_segments)
+        return self.gradient_changes
+
+    def segment(self, segment_index, total_segments, direction=None):
+        if segment_index == 0:
+            return self._sprite(("head", direction, self.glow_layers))
+        return self._sprite(("segment", self.gradient_step(segment_index, total_segments), None))
+
+    def entity_rect(self, pos):
+        """Screen area covered by a food or power-up sprite at grid pos."""
+        x, y = pos
+        return pygame.Rect((x - ENTITY_MARGIN) * CELL_SIZE, (y - ENTITY_MARGIN) * CELL_SIZE,
+                           self.entity_size, self.entity_size)
+
+    def draw_food(self, surface, pos, food_type, pulse=0.0, rotation=0.0):
+        x, y = pos
+        surface.blit(self.food(food_type, pulse, rotation),
+                     ((x - ENTITY_MARGIN) * CELL_SIZE, (y - ENTITY_MARGIN) * CELL_SIZE))
+
+    def draw_powerup(self, surface, pos, powerup_type, rotation=0.0):
+        x, y = pos
+        surface.blit(self.powerup(powerup_type, rotation),
+                     ((x - ENTITY_MARGIN) * CELL_SIZE, (y - ENTITY_MARGIN) * CELL_SIZE))
+
+    def snake_blits(self, snake, direction):
+        """(sprite, position) for every segment, head first, ready for Surface.blits."""
+        total = len(snake)
+        if total == 0:
+            return []
+        body = [self._sprite(("segment", step, None)) for step in range(self.gradient_steps)]
+        blits = [(body[step], (x * CELL_SIZE, y * CELL_SIZE)) for step, (x, y) in zip(self.gradient(total), snake)]
+        blits[0] = (self.segment(0, total, direction), blits[0][1])
+        return blits
+
+    def draw_snake(self, surface, snake, direction):
+        """Draw the whole snake with one Surface.blits call."""
+        surface.blits(self.snake_blits(snake, direction), doreturn=False)
+
+
+class SnakeLayer:
+    """The snake's blits kept from frame to frame and patched on each move instead of rebuilt.
+
+    Between moves a frame just replays the sequence. A move replaces the
+    head, drops the tail and re-colors the few segments at the edges of the
+    quantized gradient steps, so the Python work per frame doesn't grow with
+    the snake. Only growth, which rescales the whole gradient, rebuilds the
+    sequence in bulk. It is a sequence of blits rather than one pre-drawn
+    Surface: copying a screen-sized alpha layer costs more than blitting
+    every sprite of all but the longest snakes.
+    """
+
+    def __init__(self, atlas):
+        self.atlas = atlas
+        self.blits = collections.deque()  # (sprite, position) per segment, head first
+        self.head = None
+        self.length = 0
+        self.direction = None
+        self.rebuilds = 0  # Bulk rebuilds: restarts, growth and missed moves
+
+    def reset(self):
+        """Rebuild next frame, e.g. after a restart or when the atlas's head sprite changed."""
+        self.length = 0
+
+    def draw(self, surface, snake, direction):
+        self.update(snake, direction)
+        surface.blits(self.blits, doreturn=False)
+
+    def update(self, snake, direction):
+        """Bring the blits up to date with snake."""
+        total = len(snake)
+        head = snake[0] if total else None
+        previous_head, previous_length, previous_direction = self.head, self.length, self.direction
+        self.head, self.length, self.direction = head, total, direction
+        atlas = self.atlas
+        blits = self.blits
+
+        if head == previous_head and total == previous_length:
+            # Only a turn can change the head sprite between moves
+            if total and direction != previous_direction:
+                blits[0] = (atlas.segment(0, total, direction), blits[0][1])
+            return
+
+        if not (previous_length and total >= 2 and snake[1] == previous_head and total == previous_length):
+            self.blits = collections.deque(atlas.snake_blits(snake, direction))
+            self.rebuilds += 1
+            return
+
+        # Exactly one move since the last frame: every segment moved one index down the gradient
+        blits.pop()
+        blits.appendleft((atlas.segment(0, total, direction), (head[0] * CELL_SIZE, head[1] * CELL_SIZE)))
+        blits[1] = (atlas.segment(1, total), blits[1][1])
+        for index in atlas.gradient_edges(total):
+            blits[index] = (atlas.segment(index, total), blits[index][1])
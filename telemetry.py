@@ -0,0 +1,357 @@
+"""Gameplay telemetry: a fixed-size record ring flushed to compressed logs.
+
+The game loop packs each event into a preallocated ring of fixed-size
+binary records and returns; it never allocates, locks or touches the disk.
+A background thread wakes every FLUSH_INTERVAL seconds (or as soon as the
+ring is half full), copies out everything recorded since its last visit
+and appends it, gzip-compressed, to the current log file. When the ring is
+full new records are dropped and counted per kind rather than waiting, so
+the ring's size is a hard cap on telemetry memory.
+
+Each batch is sync-flushed, so a log stays readable up to its last batch
+even if the game is killed. Files rotate at MAX_FILE_BYTES and only the
+newest MAX_FILES logs are kept.
+
+File layout (after decompression):
+    header   b"SNKT", version (u8), record size (u16), session start as Unix time (f64)
+    records  RECORD: seconds since session start (f64), kind (u8), code (u8),
+             x, y (i16), number (u32), value, value2 (f32)
+
+Record fields by kind:
+    KIND_GAME     code 1 if seeded, number seed
+    KIND_FOOD     code food type, x y cell, number points
+    KIND_POWERUP  code power-up type, x y cell
+    KIND_EXPIRE   code power-up type
+    KIND_DEATH    code cause (DEATH_WALL, DEATH_SELF), x y cell, number score, value game seconds
+    KIND_WIN      x y cell, number score, value game seconds
+    KIND_SPEED    number score, value snake moves per second
+    KIND_FRAMES   code quality level, number frames, value p50 ms, value2 p99 ms
+    KIND_END      number records dropped in the session
+
+Usage:
+    python telemetry.py summary logs/           # every log in a directory, or a list of files
+    python telemetry.py dump logs/telemetry-20261017-101500-0.snkt.gz
+"""
+
+import argparse
+import glob
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+
+from game import (
+    DEATH_SELF, DEATH_WALL, EVENT_DEATH, EVENT_EXPIRE, EVENT_FOOD, EVENT_POWERUP, EVENT_WIN,
+    FOOD_COUNT, POWERUP_COUNT,
+)
+
+MAGIC = b"SNKT"
+TELEMETRY_FORMAT = 1
+HEADER = struct.Struct("<4sBHd")
+RECORD = struct.Struct("<dBBhhIff")
+RING_BYTES = 1 << 20  # Hard cap on buffered telemetry (about 40,000 records)
+FLUSH_INTERVAL = 1.0  # Seconds between background flushes
+MAX_FILE_BYTES = 4 << 20  # Compressed bytes per log file before rotating
+MAX_FILES = 16  # Newest log files kept in the directory
+FRAME_WINDOW = 300  # Frames per frame-time summary (5 s at 60 FPS)
+FILE_PATTERN = "telemetry-*.snkt.gz"
+
+KIND_GAME = 0
+KIND_FOOD = 1
+KIND_POWERUP = 2
+KIND_EXPIRE = 3
+KIND_DEATH = 4
+KIND_WIN = 5
+KIND_SPEED = 6
+KIND_FRAMES = 7
+KIND_END = 8
+KIND_NAMES = ("game", "food", "powerup", "expire", "death", "win", "speed", "frames", "end")
+
+
+class TelemetryError(Exception):
+    """Raised for malformed telemetry logs."""
+
+
+class TelemetryLog:
+    """Ring of telemetry records drained to rotating compressed files by a background thread.
+
+    record() and the helpers built on it are called from the game loop only
+    (a single producer); the flush thread is the single consumer.
+    """
+
+    def __init__(self, directory, capacity=RING_BYTES, max_file_bytes=MAX_FILE_BYTES, max_files=MAX_FILES):
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.slots = capacity // RECORD.size
+        self.ring = bytearray(self.slots * RECORD.size)
+        # Records written and records flushed since the start; only the game loop moves head and
+        # only the flush thread moves tail, so neither needs a lock
+        self.head = 0
+        self.tail = 0
+        self.dropped = [0] * len(KIND_NAMES)  # Records refused because the ring was full, by kind
+        self.lost = 0  # Records flushed but not written because of a file error
+        self.error = None  # The last file error
+        self.files = 0  # Log files started
+        self.bytes_written = 0  # Compressed bytes across every file
+        self.started = time.perf_counter()
+        self.started_unix = time.time()
+        self.speed = None  # Last recorded moves per second
+        self.frame_ns = []  # Work time of frames since the last summary
+
+        self.file = None
+        self.compressor = None
+        self.file_bytes = 0
+        self.wake = threading.Event()
+        self.running = True
+        os.makedirs(directory, exist_ok=True)
+        self.thread = threading.Thread(target=self._flush_loop, name="telemetry", daemon=True)
+        self.thread.start()
+
+    @property
+    def total_dropped(self):
+        return sum(self.dropped)
+
+    def record(self, kind, code=0, x=0, y=0, number=0, value=0.0, value2=0.0):
+        """Append one record, or count it as dropped when the ring is full. Never blocks."""
+        head = self.head
+        pending = head - self.tail
+        if pending >= self.slots:
+            self.dropped[kind] += 1
+            return False
+        RECORD.pack_into(self.ring, head % self.slots * RECORD.size, time.perf_counter() - self.started,
+                         kind, code, x, y, number, value, value2)
+        self.head = head + 1  # Publish only after the record is complete
+        if pending + 1 == self.slots // 2:
+            self.wake.set()
+        return True
+
+    def game_started(self, seed):
+        self.speed = None
+        self.record(KIND_GAME, 0 if seed is None else 1, number=(seed or 0) & 0xFFFFFFFF)
+
+    def game_events(self, events, game):
+        """Record the events one step of game returned."""
+        for event in events:
+            kind = event[0]
+            if kind == EVENT_FOOD:
+                self.record(KIND_FOOD, event[2], *event[1], number=event[3])
+            elif kind == EVENT_POWERUP:
+                self.record(KIND_POWERUP, event[2], *event[1])
+            elif kind == EVENT_EXPIRE:
+                self.record(KIND_EXPIRE, event[1])
+            elif kind == EVENT_DEATH:
+                self.record(KIND_DEATH, event[2], *event[1], number=game.score, value=game.time)
+            elif kind == EVENT_WIN:
+                self.record(KIND_WIN, 0, *event[1], number=game.score, value=game.time)
+
+    def game_speed(self, speed, score):
+        """Record the snake's moves per second when it differs from the last recorded speed."""
+        if speed != self.speed:
+            self.speed = speed
+            self.record(KIND_SPEED, number=score, value=speed)
+
+    def frame(self, frame_ns, quality):
+        """Count one frame's work time; every FRAME_WINDOW frames records their percentiles."""
+        samples = self.frame_ns
+        samples.append(frame_ns)
+        if len(samples) >= FRAME_WINDOW:
+            samples.sort()
+            count = len(samples)
+            self.record(KIND_FRAMES, quality, number=count, value=samples[count // 2] / 1e6,
+                        value2=samples[min(count - 1, count * 99 // 100)] / 1e6)
+            samples.clear()
+
+    def close(self):
+        """Write everything still buffered, then the session's drop count, and close the log."""
+        self.running = False
+        self.wake.set()
+        self.thread.join()
+        # Recorded after the last flush, so a full ring can't drop it
+        self.record(KIND_END, number=self.total_dropped)
+        self._flush()
+        self._finish_file()
+
+    def _flush_loop(self):
+        while self.running:
+            self.wake.wait(FLUSH_INTERVAL)
+            self.wake.clear()
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        head, tail = self.head, self.tail
+        if head == tail:
+            return
+        size = RECORD.size
+        start, end = tail % self.slots * size, head % self.slots * size
+        if start < end:
+            batch = self.ring[start:end]
+        else:
+            batch = self.ring[start:] + self.ring[:end]
+        self.tail = head  # The slots can be reused as soon as they are copied
+        try:
+            if self.file is None or self.file_bytes >= self.max_file_bytes:
+                self._start_file()
+            data = self.compressor.compress(batch) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.file.write(data)
+            self.file.flush()
+            self.file_bytes += len(data)
+            self.bytes_written += len(data)
+        except OSError as error:
+            self.error = error
+            self.lost += head - tail
+            self._close_file()
+
+    def _start_file(self):
+        self._finish_file()
+        name = f"telemetry-{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_unix))}-{self.files}.snkt.gz"
+        self.file = open(os.path.join(self.directory, name), "wb")
+        self.files += 1
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: a gzip stream
+        self.file_bytes = 0
+        self.file.write(self.compressor.compress(HEADER.pack(MAGIC, TELEMETRY_FORMAT, RECORD.size,
+                                                             self.started_unix)))
+        self._remove_old_files()
+
+    def _finish_file(self):
+        if self.file is None:
+            return
+        try:
+            data = self.compressor.flush(zlib.Z_FINISH)
+            self.file.write(data)
+            self.bytes_written += len(data)
+        except OSError as error:
+            self.error = error
+        self._close_file()
+
+    def _close_file(self):
+        if self.file is not None:
+            try:
+                self.file.close()
+            except OSError as error:
+                self.error = error
+        self.file = None
+        self.compressor = None
+
+    def _remove_old_files(self):
+        # Names sort by session start, then file number within the session
+        paths = sorted(glob.glob(os.path.join(self.directory, FILE_PATTERN)), key=_log_order)
+        for path in paths[:-self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _log_order(path):
+    stamp, _, number = os.path.basename(path)[len("telemetry-"):-len(".snkt.gz")].rpartition("-")
+    return stamp, int(number) if number.isdigit() else 0
+
+
+def read_log(path):
+    """Yield (seconds, kind, code, x, y, number, value, value2) records from one log file.
+
+    A log cut off mid-batch (the game was killed) yields every complete record.
+    """
+    decompressor = zlib.decompressobj(31)
+    data = bytearray()
+    with open(path, "rb") as stream:
+        while True:
+            chunk = stream.read(64 * 1024)
+            if not chunk:
+                break
+            try:
+                data += decompressor.decompress(chunk)
+            except zlib.error as error:
+                raise TelemetryError(f"{path}: damaged log ({error})") from None
+    if len(data) < HEADER.size:
+        raise TelemetryError(f"{path}: too short for a telemetry header")
+    magic, version, record_size, _ = HEADER.unpack_from(data)
+    if magic != MAGIC or version != TELEMETRY_FORMAT or record_size != RECORD.size:
+        raise TelemetryError(f"{path}: not a version {TELEMETRY_FORMAT} telemetry log")
+    end = HEADER.size + (len(data) - HEADER.size) // RECORD.size * RECORD.size
+    yield from RECORD.iter_unpack(memoryview(data)[HEADER.size:end])
+
+
+def log_paths(paths):
+    """Log files named by paths, expanding directories, oldest first."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(glob.glob(os.path.join(path, FILE_PATTERN)))
+        else:
+            found.append(path)
+    return sorted(found, key=_log_order)
+
+
+def summarize(paths):
+    """Print what the logs say about play: food, power-ups, deaths, speed and frame times."""
+    food = [0] * FOOD_COUNT
+    powerups = [0] * POWERUP_COUNT
+    expired = [0] * POWERUP_COUNT
+    deaths = {DEATH_WALL: 0, DEATH_SELF: 0}
+    games = wins = dropped = 0
+    speed_time = {}  # Moves per second -> seconds spent at that speed
+    frames = []  # (p50, p99) per frame summary
+    for path in log_paths(paths):
+        speed = since = None
+        for seconds, kind, code, x, y, number, value, value2 in read_log(path):
+            if kind == KIND_GAME:
+                games += 1
+            elif kind == KIND_FOOD:
+                food[code] += 1
+            elif kind == KIND_POWERUP:
+                powerups[code] += 1
+            elif kind == KIND_EXPIRE:
+                expired[code] += 1
+            elif kind == KIND_DEATH:
+                deaths[code] = deaths.get(code, 0) + 1
+            elif kind == KIND_WIN:
+                wins += 1
+            elif kind == KIND_FRAMES:
+                frames.append((value, value2))
+            elif kind == KIND_END:
+                dropped += number
+            if kind in (KIND_SPEED, KIND_GAME, KIND_DEATH, KIND_WIN, KIND_END):
+                # A speed holds until the next change or the end of its game
+                if speed is not None:
+                    speed_time[speed] = speed_time.get(speed, 0.0) + seconds - since
+                speed, since = (round(value, 2), seconds) if kind == KIND_SPEED else (None, None)
+
+    print(f"games: {games} ({wins} won), deaths: {deaths[DEATH_WALL]} wall, {deaths[DEATH_SELF]} self")
+    print("food eaten: " + ", ".join(f"type {food_type}: {count}" for food_type, count in enumerate(food)))
+    print("power-ups picked / expired: " + ", ".join(
+        f"type {powerup_type}: {powerups[powerup_type]} / {expired[powerup_type]}" for powerup_type in range(POWERUP_COUNT)))
+    total = sum(speed_time.values())
+    if total:
+        print("time at speed: " + ", ".join(f"{speed:g}/s {seconds / total:.0%}" for speed, seconds in sorted(speed_time.items())))
+    if frames:
+        p50s = sorted(p50 for p50, _ in frames)
+        print(f"frame time: median p50 {p50s[len(p50s) // 2]:.2f}ms, worst p99 {max(p99 for _, p99 in frames):.2f}ms "
+              f"over {len(frames)} summaries")
+    print(f"records dropped: {dropped}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read gameplay telemetry logs")
+    parser.add_argument("command", choices=["summary", "dump"])
+    parser.add_argument("paths", nargs="+", metavar="PATH", help="log files or directories of them")
+    args = parser.parse_args()
+    try:
+        if args.command == "summary":
+            summarize(args.paths)
+            return
+        for path in log_paths(args.paths):
+            for seconds, kind, code, x, y, number, value, value2 in read_log(path):
+                print(json.dumps({"t": round(seconds, 4), "kind": KIND_NAMES[kind], "code": code, "x": x, "y": y,
+                                  "number": number, "value": value, "value2": value2}))
+    except TelemetryError as error:
+        sys.exit(str(error))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Headless tournaments for bots and balance sweeps.
+
+Plays many games of game.py across a process pool. Each point of a parameter
+grid (overrides of game.py constants) is played over the same seeds, split
+into shards so every worker gets an even share; results stream back as
+shards finish and are aggregated per grid point.
+
+Usage:
+    python tournament.py --bot greedy --games 2000 \\
+        --grid GAME_SPEED=6,8,10 --grid "POWERUP_DURATIONS[3]=4.0,6.0" \\
+        --csv summary.csv --json summary.json
+"""
+
+import argparse
+import ast
+import csv
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import game as game_rules
+from autopilot import Autopilot
+from game import DIRECTIONS, EVENT_DEATH, SnakeGame
+
+DT = 1.0 / 60  # Same tick length as fixed-timestep play and replays
+OVERRIDE = re.compile(r"^([A-Z_][A-Z0-9_]*)(?:\[(\d+)\])?$")
+
+
+def greedy_bot(game, rng):
+    """Head for the food, avoiding walls and the body one move ahead."""
+    head_x, head_y = game.snake[0]
+    food = game.food or game.snake[0]
+    dx, dy = game.direction
+    width, height = game_rules.GRID_WIDTH, game_rules.GRID_HEIGHT  # May be overridden by a sweep
+    best = None
+    best_distance = None
+    for direction in DIRECTIONS:
+        if direction == (-dx, -dy):
+            continue
+        x, y = head_x + direction[0], head_y + direction[1]
+        if not (0 <= x < width and 0 <= y < height) or game.is_occupied((x, y)):
+            continue
+        distance = abs(food[0] - x) + abs(food[1] - y) + rng.random() * 0.5  # Break ties randomly
+        if best is None or distance < best_distance:
+            best, best_distance = direction, distance
+    return best
+
+
+def random_bot(game, rng):
+    """Turn at random a quarter of the time."""
+    return rng.choice(DIRECTIONS) if rng.random() < 0.25 else None
+
+
+BOTS = {"greedy": greedy_bot, "random": random_bot, "autopilot": Autopilot}  # Classes get one instance per game
+
+
+def play(seed, bot, max_ticks):
+    """Play one game to the end; returns (seed, score, length, ticks, won, death cause)."""
+    g = SnakeGame(seed)
+    rng = random.Random(seed)
+    decide = BOTS[bot]
+    if isinstance(decide, type):
+        decide = decide()
+    cause = None
+    last_head = None
+    while not g.game_over and g.ticks < max_ticks:
+        # Decide once per move: turning twice between moves could reverse into the neck
+        if g.snake[0] != last_head:
+            last_head = g.snake[0]
+            direction = decide(g, rng)
+            if direction is not None:
+                g.turn(direction)
+        for event in g.step(None, DT):
+            if event[0] == EVENT_DEATH:
+                cause = event[2]
+    return seed, g.score, len(g.snake), g.ticks, g.won, cause
+
+
+def _apply_overrides(overrides):
+    """Set game.py constants; returns what is needed to undo it."""
+    saved = []
+    for name, value in overrides.items():
+        attr, index = OVERRIDE.match(name).groups()
+        saved.append((attr, getattr(game_rules, attr)))
+        if index is None:
+            setattr(game_rules, attr, value)
+        else:
+            table = dict(getattr(game_rules, attr))
+            table[int(index)] = value
+            setattr(game_rules, attr, table)
+    return saved
+
+
+def play_shard(point, overrides, seeds, bot, max_ticks):
+    """Worker entry point: play seeds under one grid point's overrides."""
+    saved = _apply_overrides(overrides)
+    try:
+        return point, [play(seed, bot, max_ticks) for seed in seeds]
+    finally:
+        for attr, value in reversed(saved):
+            setattr(game_rules, attr, value)
+
+
+def parse_grid(specs):
+    """Turn ["NAME=v1,v2", ...] into a list of override dicts (the cartesian product)."""
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        name = name.strip()
+        match = OVERRIDE.match(name)
+        if not match or not hasattr(game_rules, match.group(1)):
+            raise ValueError(f"unknown game constant: {name}")
+        try:
+            parsed = ast.literal_eval(f"[{values}]")
+        except (ValueError, SyntaxError):
+            raise ValueError(f"bad values for {name}: {values}") from None
+        axes.append([(name, value) for value in parsed])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(overrides, results):
+    """Aggregate one grid point's per-game results into a flat row."""
+    row = {name: repr(value) for name, value in overrides.items()}
+    row["games"] = len(results)
+    for column, field in (("score", 1), ("length", 2), ("ticks", 3)):
+        values = sorted(result[field] for result in results)
+        row[f"{column}_mean"] = round(sum(values) / max(len(values), 1), 3)
+        for q in (10, 50, 90, 99):
+            row[f"{column}_p{q}"] = percentile(values, q)
+    row["wins"] = sum(result[4] for result in results)
+    row["wall_deaths"] = sum(result[5] == game_rules.DEATH_WALL for result in results)
+    row["self_deaths"] = sum(result[5] == game_rules.DEATH_SELF for result in results)
+    return row
+
+
+def run(grid, games, bot="greedy", seed=0, max_ticks=60 * 60 * 10, workers=None, shard_size=None,
+        on_shard=None):
+    """Play every grid point over seeds seed..seed+games-1; returns one summary row per point.
+
+    on_shard(point, results) is called in the parent process as each shard arrives.
+    """
+    workers = workers or os.cpu_count() or 1
+    if shard_size is None:
+        # A few shards per worker balances load without much pickling overhead
+        shard_size = max(1, min(256, games * len(grid) // (workers * 4)))
+    seeds = list(range(seed, seed + games))
+    results = [[] for _ in grid]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_shard, point, overrides, seeds[start:start + shard_size], bot, max_ticks)
+                   for point, overrides in enumerate(grid)
+                   for start in range(0, games, shard_size)]
+        for future in as_completed(futures):
+            point, shard = future.result()
+            results[point].extend(shard)
+            if on_shard:
+                on_shard(point, shard)
+    return [summarize(overrides, point_results) for overrides, point_results in zip(grid, results)]
+
+
+SUMMARY_COLUMNS = {"games", "wins", "wall_deaths", "self_deaths"} | {
+    f"{column}_{stat}" for column in ("score", "length", "ticks")
+    for stat in ("mean", "p10", "p50", "p90", "p99")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless snake tournaments across all cores")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="greedy")
+    parser.add_argument("--games", type=int, default=1000, help="games (seeds) per grid point")
+    parser.add_argument("--seed", type=int, default=0, help="first seed")
+    parser.add_argument("--max-ticks", type=int, default=60 * 60 * 10,
+                        help="stop a game after this many 1/60 s ticks")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2",
+                        help="game.py constant to sweep, e.g. GAME_SPEED=6,8 or POWERUP_DURATIONS[2]=8.0,12.0")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--shard-size", type=int, help="games per task sent to a worker")
+    parser.add_argument("--csv", help="write the summary table as CSV")
+    parser.add_argument("--json", help="write the summary table as JSON")
+    parser.add_argument("--raw", help="stream every game's result to this CSV as it arrives")
+    args = parser.parse_args()
+
+    try:
+        grid = parse_grid(args.grid)
+    except ValueError as error:
+        parser.error(str(error))
+
+    raw_file = open(args.raw, "w", newline="") if args.raw else None
+    raw = csv.writer(raw_file) if raw_file else None
+    if raw:
+        raw.writerow(["point", "seed", "score", "length", "ticks", "won", "death_cause"])
+    done = [0]
+    total = args.games * len(grid)
+
+    def on_shard(point, shard):
+        done[0] += len(shard)
+        if raw:
+            raw.writerows([point, *result] for result in shard)
+        print(f"\r{done[0]}/{total} games", end="", file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    try:
+        rows = run(grid, args.games, args.bot, args.seed, args.max_ticks, args.workers, args.shard_size, on_shard)
+    finally:
+        if raw_file:
+            raw_file.close()
+    elapsed = time.perf_counter() - start
+    print(f"\r{total} games in {elapsed:.2f}s ({total / elapsed:,.0f} games/s)", file=sys.stderr)
+
+    columns = list(rows[0])
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, columns)
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    for row in rows:
+        settings = ", ".join(f"{name}={row[name]}" for name in columns if name not in SUMMARY_COLUMNS) or "defaults"
+        print(f"{settings}: score mean {row['score_mean']} p50 {row['score_p50']} p90 {row['score_p90']}, "
+              f"length p50 {row['length_p50']}, survival p50 {row['ticks_p50']} ticks")
+
+
+if __name__ == "__main__":
+    main()
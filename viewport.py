@@ -0,0 +1,122 @@
+"""Scrolling camera for worlds larger than the window.
+
+The camera snaps to whole cells, so the cached grid background lines up at
+every position, and follows the head with a dead zone. Drawing is culled to
+the visible cells: the snake is found by slicing the game's occupancy grid
+to the view rather than walking the body, so frame cost depends on what is
+on screen, not on world size or snake length.
+"""
+
+from array import array
+
+import numpy as np
+
+import game as game_rules
+from render import CELL_SIZE, draw_border
+from sprites import ENTITY_MARGIN
+
+DEAD_ZONE = 0.3  # Fraction of the view on each side the head can move in before the camera scrolls
+MAX_TRACKED_MOVES = 16  # Moves between frames followed incrementally before re-numbering the body
+
+
+class Viewport:
+    """Camera position plus culled drawing of the world's entities."""
+
+    def __init__(self, view_cells):
+        self.width, self.height = view_cells
+        self.x = self.y = 0  # World cell at the top left of the window
+        self.serials = array("q")  # Per world cell: serial of the newest segment seen there
+        self.next_serial = 0
+        self.head_serial = -1
+        self.head = None
+        self.length = 0
+
+    def reset(self):
+        """Forget the tracked snake, so the next frame numbers the whole body; call on a new game."""
+        self.head = None
+        self.length = 0
+
+    @property
+    def offset(self):
+        """Pixel offset to subtract from world coordinates."""
+        return self.x * CELL_SIZE, self.y * CELL_SIZE
+
+    def follow(self, head):
+        """Scroll just enough to keep head inside the dead zone, clamped to the world."""
+        world_width, world_height = game_rules.GRID_WIDTH, game_rules.GRID_HEIGHT
+        margin_x, margin_y = int(self.width * DEAD_ZONE), int(self.height * DEAD_ZONE)
+        hx, hy = head
+        self.x = min(max(self.x, hx - self.width + 1 + margin_x), hx - margin_x)
+        self.y = min(max(self.y, hy - self.height + 1 + margin_y), hy - margin_y)
+        self.x = max(0, min(self.x, world_width - self.width))
+        self.y = max(0, min(self.y, world_height - self.height))
+
+    def center(self, head):
+        """Jump straight to head, e.g. on a new game."""
+        self.x = head[0] - self.width // 2
+        self.y = head[1] - self.height // 2
+        self.follow(head)
+
+    def visible(self, pos, margin=0):
+        x, y = pos
+        return (self.x - margin <= x < self.x + self.width + margin
+                and self.y - margin <= y < self.y + self.height + margin)
+
+    def draw_border(self, surface):
+        """Draw the world's border where it crosses the view."""
+        left, top = self.offset
+        draw_border(surface, (-left, -top, game_rules.GRID_WIDTH * CELL_SIZE, game_rules.GRID_HEIGHT * CELL_SIZE))
+
+    def draw_food(self, surface, atlas, pos, food_type, pulse=0.0, rotation=0.0):
+        if self.visible(pos, ENTITY_MARGIN):
+            atlas.draw_food(surface, (pos[0] - self.x, pos[1] - self.y), food_type, pulse, rotation)
+
+    def draw_powerup(self, surface, atlas, pos, powerup_type, rotation=0.0):
+        if self.visible(pos, ENTITY_MARGIN):
+            atlas.draw_powerup(surface, (pos[0] - self.x, pos[1] - self.y), powerup_type, rotation)
+
+    def draw_snake(self, surface, atlas, game):
+        """Draw the snake segments inside the view with one Surface.blits call."""
+        snake = game.snake
+        total = len(snake)
+        if total == 0:
+            return
+        self._track(snake)
+        world_width = game_rules.GRID_WIDTH
+        occupancy = np.frombuffer(game.occupancy, dtype=np.uint8).reshape(game_rules.GRID_HEIGHT, world_width)
+        rows, columns = np.nonzero(occupancy[self.y:self.y + self.height, self.x:self.x + self.width])
+        serials = self.serials
+        head_serial = self.head_serial
+        blits = []
+        for row, column in zip(rows.tolist(), columns.tolist()):
+            index = min(head_serial - serials[(row + self.y) * world_width + column + self.x], total - 1)
+            blits.append((atlas.segment(index, total, game.direction), (column * CELL_SIZE, row * CELL_SIZE)))
+        surface.blits(blits, doreturn=False)
+
+    def _track(self, snake):
+        """Number new head cells since the last frame; re-number the body after a jump."""
+        total = len(snake)
+        head = snake[0]
+        if head == self.head and total == self.length:
+            return
+        world_width, world_height = game_rules.GRID_WIDTH, game_rules.GRID_HEIGHT
+        if len(self.serials) != world_width * world_height:
+            self.serials = array("q", [-1]) * (world_width * world_height)
+        moves = None
+        if self.length:
+            for k in range(1, min(MAX_TRACKED_MOVES, total - 1) + 1):
+                if snake[k] == self.head:
+                    moves = k
+                    break
+        if moves is None:
+            # New game (see reset) or too many moves: number the whole body. Serials only ever increase,
+            # so cells from an earlier body never look occupied by this one.
+            cells = reversed(snake)
+        else:
+            cells = (snake[k] for k in range(moves - 1, -1, -1))
+        for x, y in cells:
+            if 0 <= x < world_width and 0 <= y < world_height:
+                self.serials[y * world_width + x] = self.next_serial
+            self.next_serial += 1
+        self.head_serial = self.next_serial - 1
+        self.head, self.length = head, total